@@ -35,6 +35,8 @@ ALLOWED_HOSTS.extend(
     )
 )
 
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND") or "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", "/tmp/app-messages")
 EMAIL_USE_TLS = bool(int(os.environ.get("EMAIL_USE_TLS", 0)))
 EMAIL_HOST = os.environ.get("EMAIL_HOST", "")
 EMAIL_PORT = os.environ.get("EMAIL_PORT", "")
@@ -44,6 +46,14 @@ DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "")
 DEFAULT_TO_EMAIL = os.environ.get("DEFAULT_TO_EMAIL", "")
 EMAIL_DEFAULT = os.environ.get("EMAIL_DEFAULT", "")
 
+# Email outbox: worker threads (0 sends inline), emails per connection,
+# delivery attempts and seconds before an unfinished claim is retried.
+# Periodic drains run as a uWSGI daemon, see EMAIL_OUTBOX_DRAIN_INTERVAL in scripts/run.sh
+EMAIL_OUTBOX_WORKERS = int(os.environ.get("EMAIL_OUTBOX_WORKERS", 2))
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 600
+
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
 
@@ -137,6 +147,22 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# LocMemCache is the default for development and tests only: its entries live
+# in one process. Deployments point CACHE_BACKEND/CACHE_LOCATION at redis so
+# every uWSGI worker reads the same entries; app/wsgi.py refuses to serve from
+# several workers with a process-local cache.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND") or "django.core.cache.backends.locmem.LocMemCache"
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+if CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": 10000}
+
 ADMINS = (("Notificacoes", "contato@kevinrsoares.com.br"),)
 
 # Password validation
@@ -194,11 +220,50 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "PAGE_SIZE_QUERY_PARAM": "page_size",
+    # Proxies in front of the app; 0 trusts REMOTE_ADDR (set by nginx) and ignores X-Forwarded-For
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
+    # Password recovery limits, per target email and per client IP
+    "DEFAULT_THROTTLE_RATES": {
+        "password_recover_code_email": "3/hour",
+        "password_recover_code_ip": "20/hour",
+        "password_validate_code_email": "3/hour",
+        "password_validate_code_ip": "20/hour",
+        "password_change_code_email": "3/hour",
+        "password_change_code_ip": "20/hour",
+    },
 }
 
+# Wrong guesses before a password recovery code is burned
+PASSWORD_CODE_MAX_ATTEMPTS = 3
+
 # Days to expiration
 AUTH_TOKEN_EXPIRATION_TIME = 1
 
+# Expired token purge: rows per batch. Periodic purges run as a uWSGI daemon,
+# see AUTH_TOKEN_PURGE_INTERVAL in scripts/run.sh
+AUTH_TOKEN_PURGE_BATCH_SIZE = 1000
+
+# Issue stateless signed tokens instead of authtoken rows
+AUTH_SIGNED_TOKENS = bool(int(os.environ.get("AUTH_SIGNED_TOKENS", 0)))
+
+# Cache of resolved tokens, users and roles (seconds)
+AUTH_CACHE_ALIAS = "default"
+AUTH_CACHE_TTL = int(os.environ.get("AUTH_CACHE_TTL", 60))
+
+# List counts: exact, cached, estimated or none (overridable with ?count=)
+PAGINATION_COUNT_STRATEGY = os.environ.get("PAGINATION_COUNT_STRATEGY", "exact")
+PAGINATION_COUNT_CACHE_TTL = int(os.environ.get("PAGINATION_COUNT_CACHE_TTL", 30))
+# Planner estimates below this are replaced by an exact count
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 1000
+
+# Bulk endpoints: items accepted per request / rows per INSERT
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 10000))
+BULK_WRITE_BATCH_SIZE = 1000
+
+# Dashboard responses, cached per data version (seconds)
+DASHBOARD_CACHE_ALIAS = "default"
+DASHBOARD_CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", 300))
+
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 AWS_STORAGE_BUCKET_NAME = os.environ.get("AWS_STORAGE_BUCKET_NAME", "")
 AWS_S3_REGION_NAME = os.environ.get("AWS_S3_REGION_NAME", "")
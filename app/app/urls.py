@@ -24,6 +24,7 @@ from core import views as core_views
 urlpatterns = [
     path("", core_views.home_view, name="home"),
     path("api/health-check/", core_views.health_check, name="health-check"),
+    path("api/metrics/", core_views.metrics_view, name="metrics"),
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
     path(
         "api/docs/",
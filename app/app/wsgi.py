@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_wsgi_application()
+
+try:
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
+if uwsgi is not None:
+    from utils.cache import check_shared_caches
+
+    check_shared_caches(uwsgi.numproc)
@@ -0,0 +1,39 @@
+"""
+Django command to benchmark transactional email rendering.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+from utils.email import PASSWORD_RESET_CODE_TEMPLATE
+from utils.templates import TemplateRenderer
+
+
+class Command(BaseCommand):
+    """Django command to benchmark transactional email rendering."""
+
+    help = 'Compare renders per second of get_template() per email against precompiled templates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=1000, help='Emails rendered per run.')
+        parser.add_argument('--template', default=PASSWORD_RESET_CODE_TEMPLATE, help='Template to render.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        name = options['template']
+        contexts = [{'code': str(1111 + index % 8889)} for index in range(options['batch'])]
+
+        started = time.perf_counter()
+        for context in contexts:
+            get_template(name).render(context)
+        uncached = time.perf_counter() - started
+
+        renderer = TemplateRenderer()
+        started = time.perf_counter()
+        renderer.render_many(name, contexts)
+        precompiled = time.perf_counter() - started
+
+        self.stdout.write(f'batch: {len(contexts)} emails')
+        self.stdout.write(f'get_template per email: {len(contexts) / uncached:.0f} renders/s')
+        self.stdout.write(f'precompiled: {len(contexts) / precompiled:.0f} renders/s')
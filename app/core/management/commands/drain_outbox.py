@@ -0,0 +1,19 @@
+"""
+Django command to deliver the emails waiting in the outbox.
+"""
+from core.outbox import drain_outbox
+from utils.commands import PeriodicCommand
+
+
+class Command(PeriodicCommand):
+    """Django command to deliver the emails waiting in the outbox."""
+
+    help = 'Deliver pending outbox emails, one connection per batch.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails sent per connection.')
+
+    def run_once(self, **options):
+        sent = drain_outbox(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} emails.'))
@@ -0,0 +1,43 @@
+"""
+Database models.
+"""
+import uuid
+from django.db import models
+
+
+class OutgoingEmail(models.Model):
+    """Email waiting in the outbox until a worker delivers it."""
+    PENDING = 'PENDING'
+    SENDING = 'SENDING'
+    SENT = 'SENT'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True)
+    claimed_at = models.DateTimeField(null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    content_subtype = models.CharField(max_length=20, default='plain')
+    from_email = models.CharField(max_length=255, blank=True)
+    recipients = models.JSONField()
+
+    class Meta:
+        db_table = 'email_outbox'
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                name='email_outbox_pending_idx',
+                condition=models.Q(status='PENDING'),
+            ),
+        ]
@@ -0,0 +1,193 @@
+"""
+Durable outbox for outgoing email, drained by a bounded worker pool.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(message):
+    """
+    Store an email in the outbox and wake the workers once committed.
+
+    :param message: The EmailMessage to deliver.
+    :return: The OutgoingEmail row.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=message.subject,
+        body=message.body,
+        content_subtype=message.content_subtype,
+        from_email=message.from_email or '',
+        recipients=list(message.to),
+    )
+    transaction.on_commit(email_worker_pool.wake)
+    return email
+
+
+def drain_outbox(batch_size=None):
+    """
+    Deliver pending emails, reusing one connection per batch.
+
+    Each batch is claimed in a short transaction that counts the attempt and
+    commits before any SMTP traffic, so no row lock is held while sending.
+    Concurrent drains skip claimed rows; the claim of a crashed worker
+    expires after EMAIL_OUTBOX_CLAIM_TIMEOUT seconds.
+
+    :param batch_size: Emails per batch, defaults to EMAIL_OUTBOX_BATCH_SIZE.
+    :return: The number of emails sent.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    attempted = set()
+    sent = 0
+    while True:
+        batch = _claim_batch(batch_size, attempted)
+        if not batch:
+            return sent
+        attempted.update(email.id for email in batch)
+        sent += _send_batch(batch)
+        OutgoingEmail.objects.bulk_update(batch, ['status', 'last_error', 'sent_at'])
+
+
+def _claim_batch(batch_size, attempted):
+    now = timezone.now()
+    expired = now - timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=OutgoingEmail.PENDING) | Q(status=OutgoingEmail.SENDING, claimed_at__lt=expired))
+            .exclude(id__in=attempted)
+            .order_by('created_at')[:batch_size]
+        )
+        for email in batch:
+            email.status = OutgoingEmail.SENDING
+            email.claimed_at = now
+            email.attempts += 1
+        OutgoingEmail.objects.bulk_update(batch, ['status', 'claimed_at', 'attempts'])
+    return batch
+
+
+def _record_failure(email, exc):
+    email.last_error = str(exc)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.status = OutgoingEmail.PENDING
+
+
+def _send_batch(batch):
+    sent = 0
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as exc:
+        logger.warning('Could not open the email connection: %s', exc)
+        for email in batch:
+            _record_failure(email, exc)
+        return sent
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                from_email=email.from_email or None,
+                to=email.recipients,
+                connection=mail_connection,
+            )
+            message.content_subtype = email.content_subtype
+            try:
+                message.send()
+            except Exception as exc:
+                logger.warning('Could not send email %s: %s', email.id, exc)
+                _record_failure(email, exc)
+                continue
+            email.status = OutgoingEmail.SENT
+            email.sent_at = timezone.now()
+            email.last_error = ''
+            sent += 1
+    finally:
+        try:
+            mail_connection.close()
+        except Exception as exc:
+            logger.warning('Could not close the email connection: %s', exc)
+    return sent
+
+
+class EmailWorkerPool:
+    """Bounded thread pool that drains the outbox when woken."""
+
+    def __init__(self):
+        self.sent = 0
+        self.drains = 0
+        self._queued = False
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def wake(self):
+        """Schedule a drain unless one is already waiting to start."""
+        if not settings.EMAIL_OUTBOX_WORKERS:
+            self._drain()
+            return
+        with self._lock:
+            if self._queued:
+                return
+            self._queued = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.EMAIL_OUTBOX_WORKERS, thread_name_prefix='email-outbox'
+                )
+            executor = self._executor
+        executor.submit(self._drain_in_thread)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'workers': settings.EMAIL_OUTBOX_WORKERS,
+                'drains': self.drains,
+                'sent': self.sent,
+                'queued_drain': self._queued,
+            }
+        stats['pending'] = OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING).count()
+        stats['failed'] = OutgoingEmail.objects.filter(status=OutgoingEmail.FAILED).count()
+        return stats
+
+    def _drain(self):
+        with self._lock:
+            self._queued = False
+        try:
+            sent = drain_outbox()
+        except Exception:
+            logger.exception('Email outbox drain failed.')
+            return
+        with self._lock:
+            self.drains += 1
+            self.sent += sent
+
+    def _drain_in_thread(self):
+        try:
+            self._drain()
+        finally:
+            connection.close()
+
+    def _after_fork(self):
+        # Executor threads do not survive a fork.
+        self._executor = None
+        self._queued = False
+        self._lock = threading.Lock()
+
+
+email_worker_pool = EmailWorkerPool()
+os.register_at_fork(after_in_child=email_worker_pool._after_fork)
+metrics.register('email_outbox', email_worker_pool.stats)
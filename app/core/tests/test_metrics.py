@@ -0,0 +1,44 @@
+"""
+Tests for the metrics API.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import Role
+
+METRICS_URL = reverse('metrics')
+
+
+class MetricsApiTests(TestCase):
+    """Test access to the metrics API."""
+    fixtures = ['roles.json']
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test authentication is required to read the metrics."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_admin_role_required(self):
+        """Test users without an admin role cannot read the metrics."""
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_reads_metrics(self):
+        """Test admins read the registered counters."""
+        self.user.roles.add(Role.objects.get(pk='bdb80a3e-7458-4548-95f7-1b84c7b79cda'))
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('email_outbox', res.data)
@@ -0,0 +1,133 @@
+"""
+Tests for the email outbox.
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+from core.outbox import enqueue_email, drain_outbox, email_worker_pool
+
+
+def create_message(index=0):
+    message = EmailMessage(f'Subject {index}', f'<p>Body {index}</p>', to=[f'user{index}@example.com'])
+    message.content_subtype = 'html'
+    return message
+
+
+class OutboxTests(TestCase):
+    """Test queueing and delivering outbox emails."""
+
+    def test_enqueue_stores_email(self):
+        """Test queued emails are stored and not sent before commit."""
+        enqueue_email(create_message())
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+        self.assertEqual(email.recipients, ['user0@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_OUTBOX_WORKERS=0)
+    def test_commit_wakes_workers(self):
+        """Test committing the transaction delivers the email."""
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_email(create_message())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].content_subtype, 'html')
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.SENT)
+
+    def test_drain_reuses_one_connection_per_batch(self):
+        """Test every batch opens a single connection."""
+        for index in range(5):
+            enqueue_email(create_message(index))
+
+        with patch('core.outbox.get_connection', wraps=mail.get_connection) as get_connection:
+            sent = drain_outbox(batch_size=2)
+
+        self.assertEqual(sent, 5)
+        self.assertEqual(get_connection.call_count, 3)
+        self.assertEqual(len(mail.outbox), 5)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_email_is_retried_then_marked_failed(self):
+        """Test delivery errors keep the email pending until attempts run out."""
+        enqueue_email(create_message())
+
+        with patch.object(EmailMessage, 'send', side_effect=OSError('refused')):
+            drain_outbox()
+            email = OutgoingEmail.objects.get()
+            self.assertEqual(email.status, OutgoingEmail.PENDING)
+            self.assertEqual(email.last_error, 'refused')
+            drain_outbox()
+
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.FAILED)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_connection_failure_counts_as_attempt(self):
+        """Test a connection that cannot open counts a failed attempt for every email in the batch."""
+        for index in range(3):
+            enqueue_email(create_message(index))
+        broken = mail.get_connection()
+
+        with patch.object(broken, 'open', side_effect=OSError('unreachable')), \
+                patch('core.outbox.get_connection', return_value=broken):
+            self.assertEqual(drain_outbox(), 0)
+            self.assertEqual(
+                list(OutgoingEmail.objects.values_list('status', 'attempts', 'last_error').distinct()),
+                [(OutgoingEmail.PENDING, 1, 'unreachable')],
+            )
+            drain_outbox()
+
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.FAILED).count(), 3)
+
+    def test_emails_are_claimed_before_sending(self):
+        """Test the batch is stored as claimed, with the attempt counted, while it is being sent."""
+        enqueue_email(create_message())
+        during_send = []
+
+        def send(*args, **kwargs):
+            during_send.extend(OutgoingEmail.objects.values_list('status', 'attempts'))
+
+        with patch.object(EmailMessage, 'send', side_effect=send):
+            drain_outbox()
+
+        self.assertEqual(during_send, [(OutgoingEmail.SENDING, 1)])
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.SENT)
+
+    def test_expired_claims_are_retried(self):
+        """Test emails left claimed by a crashed worker are sent once the claim expires."""
+        expired = enqueue_email(create_message(0))
+        claimed = enqueue_email(create_message(1))
+        OutgoingEmail.objects.filter(pk=expired.pk).update(
+            status=OutgoingEmail.SENDING, claimed_at=timezone.now() - timedelta(hours=1), attempts=1
+        )
+        OutgoingEmail.objects.filter(pk=claimed.pk).update(
+            status=OutgoingEmail.SENDING, claimed_at=timezone.now(), attempts=1
+        )
+
+        self.assertEqual(drain_outbox(), 1)
+        self.assertEqual(mail.outbox[0].to, ['user0@example.com'])
+        self.assertEqual(OutgoingEmail.objects.get(pk=expired.pk).attempts, 2)
+        self.assertEqual(OutgoingEmail.objects.get(pk=claimed.pk).status, OutgoingEmail.SENDING)
+
+    def test_pool_stats_report_queue_depth(self):
+        """Test the metrics expose the pending emails."""
+        enqueue_email(create_message())
+
+        self.assertEqual(email_worker_pool.stats()['pending'], 1)
+
+    def test_drain_outbox_command(self):
+        """Test the command sends pending emails."""
+        enqueue_email(create_message())
+        out = StringIO()
+
+        call_command('drain_outbox', stdout=out)
+
+        self.assertIn('Sent 1 emails.', out.getvalue())
@@ -1,10 +1,15 @@
 """
 Core views for app.
 """
-from rest_framework.decorators import api_view
+from rest_framework import permissions
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import render
 
+from user.auth import CheckTokenAuthentication
+from user.permissions import IsSuperAdmin, IsAdmin
+from utils import metrics
+
 
 @api_view(['GET'])
 def health_check(request):
@@ -12,5 +17,13 @@ def health_check(request):
     return Response({'healthy': True})
 
 
+@api_view(['GET'])
+@authentication_classes([CheckTokenAuthentication])
+@permission_classes([permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)])
+def metrics_view(request):
+    """Returns the in-process counters of this worker."""
+    return Response(metrics.collect())
+
+
 def home_view(request):
     return render(request, 'Home/default.html')
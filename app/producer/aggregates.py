@@ -0,0 +1,183 @@
+"""
+Dashboard summary tables: rebuilding them from the base tables and measuring drift.
+
+The rows are maintained by statement-level triggers on farms and
+planted_crops (see migration 0008), so every write path - ORM saves, bulk
+writes, queryset updates and raw SQL - keeps them in the same transaction.
+"""
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef, Sum
+
+from producer.models import Farm, Harvest, PlantedCrop
+
+# Fresh aggregates over the active rows, in the column order of the summary tables
+FRESH_STATES_SQL = '''
+    SELECT state, count(*), sum(total_area), sum(arable_area), sum(vegetation_area)
+    FROM farms WHERE NOT is_deleted GROUP BY state
+'''
+FRESH_CROPS_SQL = '''
+    SELECT crop_id, count(*) FROM planted_crops WHERE NOT is_deleted GROUP BY crop_id
+'''
+STORED_STATES_SQL = '''
+    SELECT state, farm_count, total_area, arable_area, vegetation_area
+    FROM dashboard_state_summary WHERE farm_count <> 0 OR total_area <> 0
+'''
+STORED_CROPS_SQL = '''
+    SELECT crop_id, planted_count FROM dashboard_crop_summary WHERE planted_count <> 0
+'''
+
+
+def lock_base_tables(cursor):
+    """Hold off writes to the summarized tables until the transaction ends."""
+    cursor.execute('LOCK TABLE farms, planted_crops IN SHARE MODE')
+
+
+def fetch_keyed(cursor, sql):
+    cursor.execute(sql)
+    return {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+
+def diff(table, stored, fresh):
+    return [
+        {'table': table, 'key': str(key), 'stored': stored.get(key), 'fresh': fresh.get(key)}
+        for key in sorted(stored.keys() | fresh.keys(), key=str)
+        if stored.get(key) != fresh.get(key)
+    ]
+
+
+def find_drift():
+    """Return the summary rows that differ from a fresh aggregation, one dict per row."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        lock_base_tables(cursor)
+        return diff(
+            'dashboard_state_summary', fetch_keyed(cursor, STORED_STATES_SQL), fetch_keyed(cursor, FRESH_STATES_SQL)
+        ) + diff(
+            'dashboard_crop_summary', fetch_keyed(cursor, STORED_CROPS_SQL), fetch_keyed(cursor, FRESH_CROPS_SQL)
+        )
+
+
+def rebuild():
+    """Replace the summary rows with a fresh aggregation of the base tables."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        lock_base_tables(cursor)
+        cursor.execute('DELETE FROM dashboard_state_summary')
+        cursor.execute(
+            'INSERT INTO dashboard_state_summary (state, farm_count, total_area, arable_area, vegetation_area) '
+            + FRESH_STATES_SQL
+        )
+        cursor.execute('DELETE FROM dashboard_crop_summary')
+        cursor.execute('INSERT INTO dashboard_crop_summary (crop_id, planted_count) ' + FRESH_CROPS_SQL)
+
+
+# Per-state rows and, through the empty grouping set, the land-use totals in the same pass; then the crop rows
+DASHBOARD_SQL = '''
+    WITH states AS (
+        SELECT state, farm_count, total_area, arable_area, vegetation_area
+        FROM dashboard_state_summary WHERE farm_count > 0
+    ), crops AS (
+        SELECT c.name, s.planted_count
+        FROM dashboard_crop_summary s JOIN crops c ON c.id = s.crop_id
+        WHERE s.planted_count > 0
+    )
+    SELECT GROUPING(state) AS kind, state, sum(farm_count)::bigint,
+           sum(total_area), sum(arable_area), sum(vegetation_area)
+    FROM states GROUP BY GROUPING SETS ((state), ())
+    UNION ALL
+    SELECT 2, name, sum(planted_count)::bigint, NULL, NULL, NULL FROM crops GROUP BY name
+'''
+STATE_ROW, LAND_USE_ROW, CROP_ROW = 0, 1, 2
+
+
+def build_dashboard(states, crops, land_use):
+    """Shape the payload from (state, count) and (crop, count) pairs, ordered by count and then name."""
+    return {
+        'farms_by_state': [
+            {'state': state, 'count': count} for state, count in sorted(states, key=lambda row: (-row[1], row[0]))
+        ],
+        'crops_distribution': [
+            {'crop': crop, 'count': count} for crop, count in sorted(crops, key=lambda row: (-row[1], row[0]))
+        ],
+        'land_use': land_use,
+    }
+
+
+def sum_land_use(areas):
+    """Add up (total, arable, vegetation) area triples; the sums are None when there are none."""
+    land_use = {'total_area': None, 'arable_area': None, 'vegetation_area': None}
+    for total_area, arable_area, vegetation_area in areas:
+        for key, value in zip(land_use, (total_area, arable_area, vegetation_area)):
+            land_use[key] = value if land_use[key] is None else land_use[key] + value
+    return land_use
+
+
+def dashboard_data_sql():
+    """Compute the dashboard payload with one statement over the summary tables."""
+    states, crops, land_use = [], [], None
+    with connection.cursor() as cursor:
+        cursor.execute(DASHBOARD_SQL)
+        for kind, key, count, total_area, arable_area, vegetation_area in cursor.fetchall():
+            if kind == STATE_ROW:
+                states.append((key, count))
+            elif kind == CROP_ROW:
+                crops.append((key, count))
+            else:
+                land_use = {'total_area': total_area, 'arable_area': arable_area, 'vegetation_area': vegetation_area}
+    return build_dashboard(states, crops, land_use)
+
+
+def dashboard_data_orm():
+    """
+    Compute the dashboard payload from the base tables with the ORM, one
+    grouped query per section, for backends without the summary triggers.
+    """
+    farms = Farm.objects.all()
+    states = farms.values_list('state').annotate(Count('id')).order_by()
+    crops = PlantedCrop.objects.values_list('crop__name').annotate(Count('id')).order_by()
+    land_use = farms.aggregate(
+        total_area=Sum('total_area'),
+        arable_area=Sum('arable_area'),
+        vegetation_area=Sum('vegetation_area'),
+    )
+    return build_dashboard(states, crops, land_use)
+
+
+def dashboard_slice(state=None, producer=None, year=None):
+    """
+    Compute the dashboard payload over the active farms matching the filters,
+    and the planted crops of their harvests in `year`.
+
+    Each section is one grouped query over the base tables, reached through
+    the partial indexes on farms(state) and harvests(year, farm_id).
+    """
+    farms = Farm.objects.all()
+    planted_crops = PlantedCrop.objects.filter(harvest__is_deleted=False, harvest__farm__is_deleted=False)
+    if state:
+        farms = farms.filter(state=state)
+        planted_crops = planted_crops.filter(harvest__farm__state=state)
+    if producer:
+        farms = farms.filter(producer_id=producer)
+        planted_crops = planted_crops.filter(harvest__farm__producer_id=producer)
+    if year:
+        farms = farms.filter(Exists(Harvest.objects.filter(farm=OuterRef('pk'), year=year)))
+        planted_crops = planted_crops.filter(harvest__year=year)
+
+    rows = list(
+        farms.values_list('state')
+        .annotate(Count('id'), Sum('total_area'), Sum('arable_area'), Sum('vegetation_area'))
+        .order_by()
+    )
+    crops = planted_crops.values_list('crop__name').annotate(count=Count('id')).order_by()
+    return build_dashboard([row[:2] for row in rows], crops, sum_land_use(row[2:] for row in rows))
+
+
+def dashboard_data(**filters):
+    """
+    Compute the dashboard payload: unfiltered from the summary tables in a
+    single statement on PostgreSQL, which maintains them, from the base
+    tables elsewhere, or for a slice.
+    """
+    if any(filters.values()):
+        return dashboard_slice(**filters)
+    if connection.vendor == 'postgresql':
+        return dashboard_data_sql()
+    return dashboard_data_orm()
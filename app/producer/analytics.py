@@ -0,0 +1,68 @@
+"""
+Materialized analytics views behind the dashboard's stale mode.
+
+analytics_farms and analytics_crops (see migration 0010) pre-aggregate the
+active farms and planted crops per state, producer and harvest year, with
+rows for every producer and every year alike, so a slice of any shape
+reads at most one row per state and crop. They lag the base tables until
+the next refresh, which runs in a single process: uWSGI attaches the
+refresh_analytics command as a daemon when ANALYTICS_REFRESH_INTERVAL is
+set, and an advisory lock skips any refresh that would overlap another.
+"""
+import logging
+import time
+
+from django.db import connection, transaction
+
+from producer.aggregates import build_dashboard, sum_land_use
+from producer.cache import dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+VIEWS = ['analytics_farms', 'analytics_crops']
+# Sentinels the views store for the rolled-up producer and year dimensions
+ALL_PRODUCERS = '00000000-0000-0000-0000-000000000000'
+ALL_YEARS = ''
+# pg_try_advisory_xact_lock key held while the views refresh
+REFRESH_LOCK_ID = 7262001
+
+
+def refresh_analytics():
+    """
+    Refresh the views without blocking their readers and stamp a new stale
+    dashboard version so cached stale responses are recomputed.
+
+    :return: The elapsed seconds, or None if another refresh was running.
+    """
+    started = time.monotonic()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [REFRESH_LOCK_ID])
+        if not cursor.fetchone()[0]:
+            logger.info('Analytics views are being refreshed elsewhere; skipped.')
+            return None
+        for view in VIEWS:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}')
+    dashboard_cache.bump_stale()
+    elapsed = time.monotonic() - started
+    logger.info('Refreshed analytics views in %.3fs.', elapsed)
+    return elapsed
+
+
+def dashboard_data_stale(state=None, producer=None, year=None):
+    """Compute the dashboard payload, optionally sliced, from the analytics views."""
+    where = 'producer_id = %s AND year = %s'
+    params = [str(producer) if producer else ALL_PRODUCERS, year or ALL_YEARS]
+    if state:
+        where += ' AND state = %s'
+        params.append(state)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT state, farm_count, total_area, arable_area, vegetation_area FROM analytics_farms WHERE {where}',
+            params,
+        )
+        farms = cursor.fetchall()
+        cursor.execute(
+            f'SELECT crop, sum(planted_count)::bigint FROM analytics_crops WHERE {where} GROUP BY crop', params
+        )
+        crops = cursor.fetchall()
+    return build_dashboard([row[:2] for row in farms], crops, sum_land_use(row[2:] for row in farms))
@@ -0,0 +1,182 @@
+"""
+Set-based writes for onboarding many producer records in one request.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from producer.models import Farm, PlantedCrop, Producer
+from producer.serializers import FarmBulkItemSerializer, ProducerBulkItemSerializer
+from utils.document_validator import normalize_document
+
+CREATED = 'created'
+UPDATED = 'updated'
+FAILED = 'failed'
+
+DUPLICATE_IN_DB = _("CPF/CNPJ já está em uso para um produtor ativo.")
+DUPLICATE_IN_BATCH = _("CPF/CNPJ repetido nesta requisição.")
+AREAS_EXCEED_TOTAL = _("The sum of the arable and vegetation areas cannot exceed the total area of ​​the farm.")
+PRODUCER_NOT_FOUND = _("Producer not found.")
+FARM_NOT_FOUND = _("Farm not found.")
+REPEATED_ID = _("Farm repeated in this request.")
+
+FARM_UPSERT_FIELDS = [
+    'name', 'city', 'state', 'total_area', 'arable_area', 'vegetation_area', 'producer_id', 'updated_at',
+]
+
+
+def success(index, status, instance_id):
+    return {'index': index, 'status': status, 'id': instance_id}
+
+
+def failure(index, errors):
+    return {'index': index, 'status': FAILED, 'errors': errors}
+
+
+def validate_items(serializer, items, results):
+    """Run the field validation of every item, recording failures; return {index: data}."""
+    valid = {}
+    for index, item in enumerate(items):
+        try:
+            valid[index] = serializer.run_validation(item)
+        except serializers.ValidationError as error:
+            results[index] = failure(index, error.detail)
+    return valid
+
+
+def bulk_create_producers(items):
+    """
+    Validate and insert producers, returning one result per item in order.
+
+    Each result is `{'index', 'status': 'created', 'id'}` or `{'index',
+    'status': 'failed', 'errors'}`. Documents are checked against each other
+    and against the active producers with one query, then inserted with
+    bulk_create; rows lost to a concurrent insert of the same document are
+    reported as duplicates.
+    """
+    results = [None] * len(items)
+    pending = {}
+    for index, data in validate_items(ProducerBulkItemSerializer(), items, results).items():
+        digits = normalize_document(data['cpf_cnpj'])
+        if digits in pending:
+            results[index] = failure(index, {'cpf_cnpj': [DUPLICATE_IN_BATCH]})
+            continue
+        pending[digits] = (index, Producer(**data))
+
+    existing = set(
+        Producer.objects.filter(cpf_cnpj_digits__in=list(pending)).values_list('cpf_cnpj_digits', flat=True)
+    )
+    for digits in existing:
+        index, _producer = pending.pop(digits)
+        results[index] = failure(index, {'cpf_cnpj': [DUPLICATE_IN_DB]})
+
+    producers = [producer for _index, producer in pending.values()]
+    Producer.objects.bulk_create(producers, batch_size=settings.BULK_WRITE_BATCH_SIZE, ignore_conflicts=True)
+    inserted = set(
+        Producer.objects.filter(id__in=[producer.id for producer in producers]).values_list('id', flat=True)
+    )
+    for index, producer in pending.values():
+        if producer.id in inserted:
+            results[index] = success(index, CREATED, producer.id)
+        else:
+            results[index] = failure(index, {'cpf_cnpj': [DUPLICATE_IN_DB]})
+    return results
+
+
+def areas_exceeding_total(total_areas, arable_areas, vegetation_areas):
+    """Positions where arable + vegetation area is larger than the total area, column by column."""
+    sums = map(sum, zip(arable_areas, vegetation_areas))
+    return [position for position, (area, total) in enumerate(zip(sums, total_areas)) if area > total]
+
+
+def bulk_upsert_farms(items):
+    """
+    Create the farms without an id and update the active farms whose id is
+    given, returning one result per item in order.
+
+    Field validation runs per item; the area rule runs over the columns of
+    the whole batch, and producers and farms are resolved with one query
+    each before a bulk_create and a bulk_update.
+    """
+    results = [None] * len(items)
+    valid = validate_items(FarmBulkItemSerializer(), items, results)
+
+    ids = Counter(data['id'] for data in valid.values() if 'id' in data)
+    repeated = {farm_id for farm_id, count in ids.items() if count > 1}
+    existing = Farm.objects.select_for_update().in_bulk([farm_id for farm_id in ids if farm_id not in repeated])
+    producers = set(
+        Producer.objects.filter(id__in={data['producer'] for data in valid.values()}).values_list('id', flat=True)
+    )
+
+    indexes = list(valid)
+    rows = list(valid.values())
+    for position in areas_exceeding_total(
+        [row['total_area'] for row in rows],
+        [row['arable_area'] for row in rows],
+        [row['vegetation_area'] for row in rows],
+    ):
+        results[indexes[position]] = failure(indexes[position], {'non_field_errors': [AREAS_EXCEED_TOTAL]})
+
+    now = timezone.now()
+    created, updated = [], []
+    for index, data in valid.items():
+        errors = {}
+        if data['producer'] not in producers:
+            errors['producer'] = [PRODUCER_NOT_FOUND]
+        if data.get('id') in repeated:
+            errors['id'] = [REPEATED_ID]
+        elif 'id' in data and data['id'] not in existing:
+            errors['id'] = [FARM_NOT_FOUND]
+        if errors or results[index] is not None:
+            results[index] = failure(index, {**(results[index] or {}).get('errors', {}), **errors})
+            continue
+        data['producer_id'] = data.pop('producer')
+        if 'id' in data:
+            farm = existing[data.pop('id')]
+            for field, value in data.items():
+                setattr(farm, field, value)
+            farm.updated_at = now
+            updated.append(farm)
+            results[index] = success(index, UPDATED, farm.id)
+        else:
+            farm = Farm(**data)
+            created.append(farm)
+            results[index] = success(index, CREATED, farm.id)
+
+    Farm.objects.bulk_create(created, batch_size=settings.BULK_WRITE_BATCH_SIZE)
+    Farm.objects.bulk_update(updated, FARM_UPSERT_FIELDS, batch_size=settings.BULK_WRITE_BATCH_SIZE)
+    return results
+
+
+def set_harvest_crops(harvest, crop_ids):
+    """
+    Make `crop_ids` the active planted crops of `harvest`, returning the
+    added and removed crop ids.
+
+    Callers hold a lock on the harvest row so concurrent calls apply one
+    after the other; calling again with the same list changes nothing.
+    Missing crops are inserted with bulk_create; dropped crops, and any
+    duplicate rows of a kept crop, are soft deleted with one UPDATE.
+    """
+    wanted = set(crop_ids)
+    kept, stale = set(), []
+    rows = PlantedCrop.objects.filter(harvest=harvest).order_by('created_at', 'id').values_list('id', 'crop_id')
+    for row_id, crop_id in rows:
+        if crop_id in wanted and crop_id not in kept:
+            kept.add(crop_id)
+        else:
+            stale.append((row_id, crop_id))
+
+    added = [crop_id for crop_id in crop_ids if crop_id not in kept]
+    PlantedCrop.objects.bulk_create(
+        [PlantedCrop(harvest=harvest, crop_id=crop_id) for crop_id in added],
+        batch_size=settings.BULK_WRITE_BATCH_SIZE,
+    )
+    PlantedCrop.objects.filter(id__in=[row_id for row_id, _crop_id in stale]).update(
+        is_deleted=True, updated_at=timezone.now()
+    )
+    removed = list(dict.fromkeys(crop_id for _row_id, crop_id in stale if crop_id not in wanted))
+    return added, removed
@@ -0,0 +1,139 @@
+"""
+Shared cache of dashboard responses.
+
+Entries are keyed by a global data version and the requested slice.
+Every successful write through the producer API stamps a new version, so
+identical requests between writes are answered from the cache and the
+entries of older versions simply expire. Stale responses, read from the
+analytics views, carry a version of their own that only a refresh of the
+views stamps.
+
+Versions only invalidate what every process can see, so with a process-local
+backend such as LocMemCache nothing is cached and every request computes
+its payload; ETags still spare the response body.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from utils import metrics
+from utils.cache import is_process_local
+
+VERSION_KEY = 'dashboard:version'
+STALE_VERSION_KEY = 'dashboard:stale-version'
+
+
+class DashboardCache:
+    """Version-stamped cache of dashboard payloads and their ETags."""
+
+    def __init__(self, alias, ttl):
+        self.alias = alias
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.recompute_seconds = 0.0
+        self.last_recompute_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def shared(self):
+        return not is_process_local(self.alias)
+
+    def get_or_compute(self, filters, compute, stale=False):
+        """
+        Return the (etag, data) entry for the current version and the slice
+        `filters`, calling `compute` to build the data on a miss.
+        """
+        shared = self.shared
+        if shared:
+            key = self._entry_key(self.version(stale), filters)
+            entry = self.cache.get(key)
+            if entry is not None:
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+        started = time.perf_counter()
+        data = compute()
+        elapsed = time.perf_counter() - started
+        entry = (self._etag(data), data)
+        if shared:
+            self.cache.set(key, entry, self.ttl)
+        with self._lock:
+            self.misses += 1
+            self.recompute_seconds += elapsed
+            self.last_recompute_seconds = elapsed
+        return entry
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def version(self, stale=False):
+        key = STALE_VERSION_KEY if stale else VERSION_KEY
+        version = self.cache.get(key)
+        if version is None:
+            # Another worker may stamp the version concurrently; keep theirs.
+            self.cache.add(key, uuid.uuid4().hex, None)
+            version = self.cache.get(key)
+        return version
+
+    def bump(self):
+        """Stamp a new version, orphaning every cached fresh response."""
+        self.cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+    def bump_stale(self):
+        """Stamp a new stale version, orphaning every cached stale response."""
+        self.cache.set(STALE_VERSION_KEY, uuid.uuid4().hex, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self.cache.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.not_modified = 0
+            self.recompute_seconds = 0.0
+            self.last_recompute_seconds = 0.0
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'backend': settings.CACHES[self.alias]['BACKEND'],
+                'shared': self.shared,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else None,
+                'not_modified': self.not_modified,
+                'recompute_seconds_total': self.recompute_seconds,
+                'recompute_seconds_last': self.last_recompute_seconds,
+            }
+
+    @staticmethod
+    def _entry_key(version, filters):
+        query = urlencode(sorted((key, str(value)) for key, value in filters.items() if value))
+        return f'dashboard:{version}:{hashlib.sha256(query.encode()).hexdigest()}'
+
+    @staticmethod
+    def _etag(data):
+        body = json.dumps(data, sort_keys=True, default=str)
+        return f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+
+
+dashboard_cache = DashboardCache(
+    alias=settings.DASHBOARD_CACHE_ALIAS,
+    ttl=settings.DASHBOARD_CACHE_TTL,
+)
+metrics.register('dashboard_cache', dashboard_cache.stats)
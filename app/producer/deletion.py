@@ -0,0 +1,41 @@
+"""
+Set-based soft delete that cascades to the rows under the deleted one.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from producer.models import Crop, Farm, Harvest, PlantedCrop, Producer
+
+# Rows soft deleted along with their parent: (child model, foreign key to the parent)
+CHILDREN = {
+    Producer: [(Farm, 'producer')],
+    Farm: [(Harvest, 'farm')],
+    Harvest: [(PlantedCrop, 'harvest')],
+    Crop: [(PlantedCrop, 'crop')],
+}
+
+
+def soft_delete(instance):
+    """
+    Soft delete `instance` and every row under it, returning the number of
+    rows deleted per table.
+
+    Each level is one UPDATE whose scope is a subquery over the level above,
+    so the cost does not grow with round trips per descendant. Scopes read
+    deleted rows too, which also retires children left active under parents
+    deleted before deletes cascaded.
+    """
+    model = type(instance)
+    now = timezone.now()
+    counts = {}
+    levels = [(model, model.all_objects.filter(pk=instance.pk))]
+    with transaction.atomic():
+        while levels:
+            model, scope = levels.pop(0)
+            table = model._meta.db_table
+            counts[table] = counts.get(table, 0) + scope.filter(is_deleted=False).update(
+                is_deleted=True, updated_at=now
+            )
+            for child, field in CHILDREN.get(model, []):
+                levels.append((child, child.all_objects.filter(**{f'{field}__in': scope.values('pk')})))
+    return counts
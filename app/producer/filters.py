@@ -1,10 +1,11 @@
 from django_filters import rest_framework as filters
 from producer.models import Producer, Farm, Crop, Harvest, PlantedCrop
+from utils.lookups import TrigramIContains
 
 
 class ProducerFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
-    cpf_cnpj = filters.CharFilter(field_name='cpf_cnpj', lookup_expr='icontains')
+    name = filters.CharFilter(field_name='name', lookup_expr=TrigramIContains.lookup_name)
+    cpf_cnpj = filters.CharFilter(field_name='cpf_cnpj', lookup_expr=TrigramIContains.lookup_name)
 
     class Meta:
         model = Producer
@@ -12,8 +13,8 @@ class ProducerFilter(filters.FilterSet):
 
 
 class FarmFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
-    city = filters.CharFilter(field_name='city', lookup_expr='icontains')
+    name = filters.CharFilter(field_name='name', lookup_expr=TrigramIContains.lookup_name)
+    city = filters.CharFilter(field_name='city', lookup_expr=TrigramIContains.lookup_name)
     state = filters.CharFilter(field_name='state', lookup_expr='iexact')
     producer = filters.CharFilter(field_name='producer__id', lookup_expr='exact')
 
@@ -23,7 +24,7 @@ class FarmFilter(filters.FilterSet):
 
 
 class CropFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    name = filters.CharFilter(field_name='name', lookup_expr=TrigramIContains.lookup_name)
 
     class Meta:
         model = Crop
@@ -0,0 +1,97 @@
+"""
+Django command to benchmark the dashboard query paths.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from producer.aggregates import dashboard_data_orm, dashboard_data_sql
+from producer.models import Crop, Farm, Harvest, PlantedCrop, Producer
+
+STATES = [
+    'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS', 'MG', 'PA',
+    'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO',
+]
+# The single statement reads the trigger-maintained summary tables; the legacy
+# path runs the three grouped queries over farms and planted_crops it replaced
+PATHS = {'single statement': dashboard_data_sql, 'legacy aggregation': dashboard_data_orm}
+
+
+class Rollback(Exception):
+    """Raised to discard the seeded rows."""
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the dashboard query paths."""
+
+    help = (
+        'Seed farms in steps and time the single-statement dashboard query over the summary tables '
+        'against the legacy three-query aggregation of the base tables. '
+        'Seeded rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--farms', type=int, nargs='+', default=[10000, 1000000, 10000000],
+            help='Farm counts to measure at, in increasing order.',
+        )
+        parser.add_argument('--crops', type=int, default=50, help='Crops planted on the seeded harvest.')
+        parser.add_argument('--repeat', type=int, default=50, help='Runs of each path per step.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        try:
+            with transaction.atomic():
+                producer = Producer.objects.create(name='Benchmark', cpf_cnpj='000.000.000-00')
+                self.seed_crops(producer, options['crops'])
+                seeded = 1
+                for farms in sorted(options['farms']):
+                    self.seed_farms(producer, seeded, farms)
+                    seeded = farms
+                    self.measure(farms, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+        # Planner statistics outlive the rollback; refresh them for the real rows.
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Farm._meta.db_table}, {PlantedCrop._meta.db_table}')
+
+    def seed_crops(self, producer, count):
+        farm = Farm.objects.create(
+            name='Farm', city='City', state=STATES[0], total_area=100, arable_area=60, vegetation_area=40,
+            producer=producer,
+        )
+        harvest = Harvest.objects.create(year='2024', farm=farm)
+        crops = Crop.objects.bulk_create([Crop(name=f'Crop {index}') for index in range(count)])
+        PlantedCrop.objects.bulk_create([PlantedCrop(harvest=harvest, crop=crop) for crop in crops])
+
+    def seed_farms(self, producer, start, stop):
+        self.stdout.write(f'seeding farms {start + 1}..{stop}...')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                INSERT INTO {Farm._meta.db_table} (
+                    id, created_at, updated_at, is_active, is_deleted, name, city, state,
+                    total_area, arable_area, vegetation_area, producer_id
+                )
+                SELECT gen_random_uuid(), now(), now(), true, i %% 20 = 0, 'Farm', 'City',
+                       (%s::text[])[i %% %s + 1], 100 + i %% 900, 60 + i %% 40, 40, %s
+                FROM generate_series(%s, %s) AS i
+                ''',
+                [STATES, len(STATES), producer.id, start + 1, stop],
+            )
+
+    def measure(self, farms, repeat):
+        for label, compute in PATHS.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                compute()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'{farms} farms, {label}: mean {statistics.mean(timings):.2f} ms, '
+                f'p50 {timings[len(timings) // 2]:.2f} ms, p95 {timings[int(len(timings) * 0.95)]:.2f} ms'
+            )
@@ -0,0 +1,84 @@
+"""
+Django command to benchmark the producer name and document filters.
+"""
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from producer.filters import ProducerFilter
+from producer.models import Producer
+
+
+class Rollback(Exception):
+    """Raised to discard the seeded rows."""
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the producer search filters."""
+
+    help = (
+        'Seed producers and compare the plans of plain icontains against the trigram-backed '
+        'filters. Seeded rows are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000000, help='Producers to seed.')
+        parser.add_argument('--name', default='a1b2c', help='Name fragment to search for.')
+        parser.add_argument('--document', default='345.12', help='CPF/CNPJ fragment to search for.')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        searches = {'name': options['name'], 'cpf_cnpj': options['document']}
+        try:
+            with transaction.atomic():
+                self.seed(options['rows'])
+                for field, term in searches.items():
+                    legacy = Producer.objects.filter(**{f'{field}__icontains': term})
+                    current = ProducerFilter(data={field: term}, queryset=Producer.objects.all()).qs
+                    self.report(f'{field} icontains', legacy)
+                    self.report(f'{field} filter', current)
+                raise Rollback
+        except Rollback:
+            pass
+        # Planner statistics outlive the rollback; refresh them for the real rows.
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Producer._meta.db_table}')
+
+    def seed(self, rows):
+        self.stdout.write(f'seeding {rows} producers...')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                INSERT INTO {Producer._meta.db_table}
+                    (id, created_at, updated_at, is_active, is_deleted, name, cpf_cnpj, cpf_cnpj_digits)
+                SELECT gen_random_uuid(), now(), now(), true, false, name, document,
+                       regexp_replace(document, '[^0-9]', '', 'g')
+                FROM (
+                    SELECT 'Producer ' || md5(i::text) AS name,
+                           lpad((i %% 1000)::text, 3, '0') || '.' || lpad((i / 1000 %% 1000)::text, 3, '0') || '.'
+                           || lpad((i %% 997)::text, 3, '0') || '-' || lpad((i %% 97)::text, 2, '0') AS document
+                    FROM generate_series(1, %s) AS i
+                ) AS seed
+                ''',
+                [rows],
+            )
+            cursor.execute(f'ANALYZE {Producer._meta.db_table}')
+
+    def report(self, label, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans = ', '.join(self.scans(plan[0]['Plan']))
+        self.stdout.write(
+            f'{label}: {scans}; {int(plan[0]["Plan"]["Actual Rows"])} rows in {plan[0]["Execution Time"]:.2f} ms'
+        )
+
+    def scans(self, node):
+        if 'Scan' in node['Node Type']:
+            yield f'{node["Node Type"]} on {node.get("Index Name") or node.get("Relation Name")}'
+        for child in node.get('Plans', []):
+            yield from self.scans(child)
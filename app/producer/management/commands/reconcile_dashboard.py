@@ -0,0 +1,32 @@
+"""
+Django command to check the dashboard summary tables for drift and rebuild them.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from producer.aggregates import find_drift, rebuild
+from producer.cache import dashboard_cache
+
+
+class Command(BaseCommand):
+    """Django command to reconcile the dashboard summary tables."""
+
+    help = 'Compare the dashboard summary tables with a fresh aggregation and rebuild them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true', help='Only report drift, exiting with an error if any is found.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        drift = find_drift()
+        for row in drift:
+            self.stdout.write(f"{row['table']} {row['key']}: stored {row['stored']}, fresh {row['fresh']}")
+        if options['check']:
+            if drift:
+                raise CommandError(f'{len(drift)} summary rows drifted.')
+            self.stdout.write(self.style.SUCCESS('Dashboard summaries match.'))
+            return
+        rebuild()
+        dashboard_cache.bump()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt dashboard summaries; {len(drift)} rows had drifted.'))
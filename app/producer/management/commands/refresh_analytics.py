@@ -0,0 +1,41 @@
+"""
+Django command to refresh the materialized analytics views.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from producer.analytics import refresh_analytics
+
+
+class Command(BaseCommand):
+    """Django command to refresh the materialized analytics views."""
+
+    help = 'Refresh the analytics views read by the stale dashboard mode, without blocking readers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and refresh every INTERVAL seconds (uWSGI attaches it as a daemon).',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if not options['interval']:
+            self.refresh()
+            return
+        while True:
+            time.sleep(options['interval'])
+            close_old_connections()
+            try:
+                self.refresh()
+            except Exception as exc:
+                self.stderr.write(f'Refreshing analytics views failed: {exc}')
+
+    def refresh(self):
+        elapsed = refresh_analytics()
+        if elapsed is None:
+            self.stdout.write('Analytics views are being refreshed by another process; skipped.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Refreshed analytics views in {elapsed:.3f}s.'))
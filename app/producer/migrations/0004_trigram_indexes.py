@@ -0,0 +1,37 @@
+# Generated by Django 4.0.10 on 2026-10-18 08:54
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0002_trigram_extension'),
+        ('producer', '0003_alter_producer_cpf_cnpj'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='crop',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='crops_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='farm',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='farms_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='farm',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['city'], name='farms_city_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='producer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='producers_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='producer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['cpf_cnpj'], name='producers_cpf_cnpj_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.0.10 on 2026-10-18 08:59
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('producer', '0004_trigram_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='crop',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['name', 'id'], name='crops_active_name'),
+        ),
+        AddIndexConcurrently(
+            model_name='farm',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['name', 'id'], name='farms_active_name'),
+        ),
+        AddIndexConcurrently(
+            model_name='farm',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['producer'], name='farms_active_producer'),
+        ),
+        AddIndexConcurrently(
+            model_name='harvest',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['year', 'id'], name='harvests_active_year'),
+        ),
+        AddIndexConcurrently(
+            model_name='harvest',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['farm'], name='harvests_active_farm'),
+        ),
+        AddIndexConcurrently(
+            model_name='plantedcrop',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['harvest', 'id'], name='planted_crops_active_harvest'),
+        ),
+        AddIndexConcurrently(
+            model_name='plantedcrop',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['crop'], name='planted_crops_active_crop'),
+        ),
+        AddIndexConcurrently(
+            model_name='producer',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['name', 'id'], name='producers_active_name'),
+        ),
+        AddIndexConcurrently(
+            model_name='producer',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['cpf_cnpj'], name='producers_active_cpf_cnpj'),
+        ),
+    ]
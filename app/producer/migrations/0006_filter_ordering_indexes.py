@@ -0,0 +1,39 @@
+# Generated by Django 4.0.10 on 2026-10-18 09:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('producer', '0005_active_row_indexes'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='farm',
+            name='farms_active_producer',
+        ),
+        RemoveIndexConcurrently(
+            model_name='harvest',
+            name='harvests_active_farm',
+        ),
+        RemoveIndexConcurrently(
+            model_name='plantedcrop',
+            name='planted_crops_active_crop',
+        ),
+        AddIndexConcurrently(
+            model_name='farm',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['producer', 'name', 'id'], name='farms_active_producer'),
+        ),
+        AddIndexConcurrently(
+            model_name='harvest',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['farm', 'year', 'id'], name='harvests_active_farm'),
+        ),
+        AddIndexConcurrently(
+            model_name='plantedcrop',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['crop', 'harvest', 'id'], name='planted_crops_active_crop'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# Rows soft deleted before deletes cascaded can still have active children.
+# Retire them level by level with the same set-based updates as
+# producer.deletion.soft_delete, so the dashboard summaries built by 0008
+# only count rows whose parents are active.
+CASCADE_SOFT_DELETES = [
+    '''
+    UPDATE farms SET is_deleted = true, updated_at = now()
+    WHERE NOT is_deleted AND producer_id IN (SELECT id FROM producers WHERE is_deleted)
+    ''',
+    '''
+    UPDATE harvests SET is_deleted = true, updated_at = now()
+    WHERE NOT is_deleted AND farm_id IN (SELECT id FROM farms WHERE is_deleted)
+    ''',
+    '''
+    UPDATE planted_crops SET is_deleted = true, updated_at = now()
+    WHERE NOT is_deleted AND (
+        harvest_id IN (SELECT id FROM harvests WHERE is_deleted)
+        OR crop_id IN (SELECT id FROM crops WHERE is_deleted)
+    )
+    ''',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producer', '0007_producer_cpf_cnpj_digits'),
+    ]
+
+    operations = [
+        # Which children were active before cannot be told apart afterwards
+        migrations.RunSQL(CASCADE_SOFT_DELETES, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations, models
+import utils.fields
+
+
+def backfill_cpf_cnpj_digits(apps, schema_editor):
+    """Fill the digits column and refuse to continue over duplicated active documents."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE producers SET cpf_cnpj_digits = regexp_replace(cpf_cnpj, '[^0-9]', '', 'g')"
+        )
+        cursor.execute(
+            '''
+            SELECT cpf_cnpj_digits, count(*) FROM producers
+            WHERE NOT is_deleted GROUP BY cpf_cnpj_digits HAVING count(*) > 1
+            '''
+        )
+        duplicates = cursor.fetchall()
+    if duplicates:
+        raise RuntimeError(
+            'Active producers share a CPF/CNPJ; soft delete or fix them before migrating: '
+            + ', '.join(f'{digits} ({count})' for digits, count in duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producer', '0006_filter_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producer',
+            name='cpf_cnpj_digits',
+            field=utils.fields.DocumentDigitsField(default='', source='cpf_cnpj'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_cpf_cnpj_digits, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='producer',
+            name='producers_active_cpf_cnpj',
+        ),
+        migrations.AddConstraint(
+            model_name='producer',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('is_deleted', False)),
+                fields=('cpf_cnpj_digits',),
+                name='producers_active_cpf_cnpj_digits',
+            ),
+        ),
+    ]
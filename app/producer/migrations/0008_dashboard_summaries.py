@@ -0,0 +1,109 @@
+# Generated by Django 4.0.10 on 2026-10-18 09:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# One upsert per statement over the transition tables: +1 for each active new row, -1 for each active old row
+STATE_DELTA = '''
+        INSERT INTO dashboard_state_summary AS s (state, farm_count, total_area, arable_area, vegetation_area)
+        SELECT state, sum(sign), sum(sign * total_area), sum(sign * arable_area), sum(sign * vegetation_area)
+        FROM ({rows}) AS delta
+        GROUP BY state
+        HAVING sum(sign) <> 0 OR sum(sign * total_area) <> 0 OR sum(sign * arable_area) <> 0
+            OR sum(sign * vegetation_area) <> 0
+        ORDER BY state
+        ON CONFLICT (state) DO UPDATE SET
+            farm_count = s.farm_count + EXCLUDED.farm_count,
+            total_area = s.total_area + EXCLUDED.total_area,
+            arable_area = s.arable_area + EXCLUDED.arable_area,
+            vegetation_area = s.vegetation_area + EXCLUDED.vegetation_area;'''
+STATE_ROWS = 'SELECT state, {sign} AS sign, total_area, arable_area, vegetation_area FROM {table} WHERE NOT is_deleted'
+
+CROP_DELTA = '''
+        INSERT INTO dashboard_crop_summary AS s (crop_id, planted_count)
+        SELECT crop_id, sum(sign) FROM ({rows}) AS delta
+        GROUP BY crop_id
+        HAVING sum(sign) <> 0
+        ORDER BY crop_id
+        ON CONFLICT (crop_id) DO UPDATE SET planted_count = s.planted_count + EXCLUDED.planted_count;'''
+CROP_ROWS = 'SELECT crop_id, {sign} AS sign FROM {table} WHERE NOT is_deleted'
+
+
+def sync_function(name, delta, rows):
+    inserted = rows.format(sign=1, table='new_rows')
+    deleted = rows.format(sign=-1, table='old_rows')
+    return f'''
+    CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{delta.format(rows=inserted)}
+        ELSIF TG_OP = 'UPDATE' THEN{delta.format(rows=f'{inserted} UNION ALL {deleted}')}
+        ELSE{delta.format(rows=deleted)}
+        END IF;
+        RETURN NULL;
+    END
+    $$;
+    '''
+
+
+def sync_triggers(table, function):
+    return f'''
+    CREATE TRIGGER {table}_summary_insert AFTER INSERT ON {table}
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+    CREATE TRIGGER {table}_summary_update AFTER UPDATE ON {table}
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+    CREATE TRIGGER {table}_summary_delete AFTER DELETE ON {table}
+        REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+    '''
+
+
+BACKFILL = '''
+    INSERT INTO dashboard_state_summary (state, farm_count, total_area, arable_area, vegetation_area)
+    SELECT state, count(*), sum(total_area), sum(arable_area), sum(vegetation_area)
+    FROM farms WHERE NOT is_deleted GROUP BY state;
+    INSERT INTO dashboard_crop_summary (crop_id, planted_count)
+    SELECT crop_id, count(*) FROM planted_crops WHERE NOT is_deleted GROUP BY crop_id;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producer', '0007_cascade_soft_deletes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CropSummary',
+            fields=[
+                ('crop', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='summary', serialize=False, to='producer.crop')),
+                ('planted_count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'dashboard_crop_summary',
+            },
+        ),
+        migrations.CreateModel(
+            name='StateSummary',
+            fields=[
+                ('state', models.CharField(max_length=2, primary_key=True, serialize=False)),
+                ('farm_count', models.BigIntegerField(default=0)),
+                ('total_area', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('arable_area', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('vegetation_area', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+            ],
+            options={
+                'db_table': 'dashboard_state_summary',
+            },
+        ),
+        migrations.RunSQL(
+            sync_function('dashboard_state_summary_sync', STATE_DELTA, STATE_ROWS)
+            + sync_triggers('farms', 'dashboard_state_summary_sync')
+            + sync_function('dashboard_crop_summary_sync', CROP_DELTA, CROP_ROWS)
+            + sync_triggers('planted_crops', 'dashboard_crop_summary_sync')
+            + BACKFILL,
+            '''
+            DROP FUNCTION dashboard_state_summary_sync() CASCADE;
+            DROP FUNCTION dashboard_crop_summary_sync() CASCADE;
+            ''',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.10 on 2026-10-18 09:22
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('producer', '0008_dashboard_summaries'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='farm',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['state'], include=('id', 'producer', 'total_area', 'arable_area', 'vegetation_area'), name='farms_active_state'),
+        ),
+        AddIndexConcurrently(
+            model_name='harvest',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['year', 'farm'], name='harvests_active_year_farm'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# Rolled-up dimensions are stored as sentinels so the unique indexes required
+# by REFRESH ... CONCURRENTLY cover every row: the nil UUID stands for every
+# producer and '' for every year.
+CREATE_VIEWS = '''
+    CREATE MATERIALIZED VIEW analytics_farms AS
+    WITH farm_years AS (
+        SELECT f.state, f.producer_id, f.total_area, f.arable_area, f.vegetation_area, y.year
+        FROM farms f
+        CROSS JOIN LATERAL (
+            SELECT DISTINCT h.year FROM harvests h WHERE h.farm_id = f.id AND NOT h.is_deleted
+            UNION ALL
+            SELECT ''
+        ) AS y
+        WHERE NOT f.is_deleted
+    )
+    SELECT state,
+           COALESCE(producer_id, '00000000-0000-0000-0000-000000000000') AS producer_id,
+           year,
+           count(*) AS farm_count,
+           sum(total_area) AS total_area,
+           sum(arable_area) AS arable_area,
+           sum(vegetation_area) AS vegetation_area
+    FROM farm_years
+    GROUP BY GROUPING SETS ((state, year), (state, producer_id, year));
+
+    CREATE UNIQUE INDEX analytics_farms_slice ON analytics_farms (producer_id, year, state);
+
+    CREATE MATERIALIZED VIEW analytics_crops AS
+    SELECT f.state,
+           COALESCE(f.producer_id, '00000000-0000-0000-0000-000000000000') AS producer_id,
+           COALESCE(h.year, '') AS year,
+           c.name AS crop,
+           count(*) AS planted_count
+    FROM planted_crops pc
+    JOIN harvests h ON h.id = pc.harvest_id AND NOT h.is_deleted
+    JOIN farms f ON f.id = h.farm_id AND NOT f.is_deleted
+    JOIN crops c ON c.id = pc.crop_id
+    WHERE NOT pc.is_deleted
+    GROUP BY GROUPING SETS (
+        (f.state, c.name), (f.state, h.year, c.name), (f.state, f.producer_id, c.name),
+        (f.state, f.producer_id, h.year, c.name)
+    );
+
+    CREATE UNIQUE INDEX analytics_crops_slice ON analytics_crops (producer_id, year, state, crop);
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producer', '0009_dashboard_slice_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_VIEWS,
+            '''
+            DROP MATERIALIZED VIEW analytics_crops;
+            DROP MATERIALIZED VIEW analytics_farms;
+            ''',
+        ),
+    ]
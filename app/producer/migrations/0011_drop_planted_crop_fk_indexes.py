@@ -0,0 +1,44 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The partial planted_crops_active_harvest and planted_crops_active_crop
+# indexes lead with the same columns, so the single-column foreign key indexes
+# only add write cost. They are dropped without blocking writes, one statement
+# at a time since CONCURRENTLY cannot run in a multi-statement query.
+DROP_INDEXES = [
+    'DROP INDEX CONCURRENTLY IF EXISTS planted_crops_harvest_id_2f3fa108',
+    'DROP INDEX CONCURRENTLY IF EXISTS planted_crops_crop_id_0ce42053',
+]
+
+CREATE_INDEXES = [
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS planted_crops_harvest_id_2f3fa108 ON planted_crops (harvest_id)',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS planted_crops_crop_id_0ce42053 ON planted_crops (crop_id)',
+]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('producer', '0010_analytics_views'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(DROP_INDEXES, CREATE_INDEXES),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='plantedcrop',
+                    name='crop',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='planted_crops', to='producer.crop'),
+                ),
+                migrations.AlterField(
+                    model_name='plantedcrop',
+                    name='harvest',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='planted_crops', to='producer.harvest'),
+                ),
+            ],
+        ),
+    ]
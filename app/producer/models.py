@@ -1,17 +1,31 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
-from utils.base_model import BaseModel
+from utils.base_model import ACTIVE_ROWS, BaseModel
 from django.core.validators import MinValueValidator
 from utils.document_validator import validate_cpf_cnpj
+from utils.fields import DocumentDigitsField
 
 
 class Producer(BaseModel):
     cpf_cnpj = models.CharField(
         max_length=18, validators=[validate_cpf_cnpj]
     )
+    # Digits only; unique among active producers
+    cpf_cnpj_digits = DocumentDigitsField(source='cpf_cnpj')
     name = models.CharField(max_length=255)
 
     class Meta:
         db_table = 'producers'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cpf_cnpj_digits'], condition=ACTIVE_ROWS, name='producers_active_cpf_cnpj_digits'
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=['name'], name='producers_name_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['cpf_cnpj'], name='producers_cpf_cnpj_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['name', 'id'], name='producers_active_name', condition=ACTIVE_ROWS),
+        ]
 
     def __str__(self):
         return self.name
@@ -30,12 +44,25 @@ class Farm(BaseModel):
     vegetation_area = models.DecimalField(
         max_digits=10, decimal_places=2, validators=[MinValueValidator(0)]
     )
+    # Keeps its own index: soft delete cascades look farms up by producer
+    # among deleted rows too, which the partial indexes below do not cover
     producer = models.ForeignKey(
         Producer, related_name="farms", on_delete=models.CASCADE
     )
 
     class Meta:
         db_table = 'farms'
+        indexes = [
+            GinIndex(fields=['name'], name='farms_name_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['city'], name='farms_city_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['name', 'id'], name='farms_active_name', condition=ACTIVE_ROWS),
+            models.Index(fields=['producer', 'name', 'id'], name='farms_active_producer', condition=ACTIVE_ROWS),
+            # Dashboard slices by state read the areas from the index alone
+            models.Index(
+                fields=['state'], name='farms_active_state', condition=ACTIVE_ROWS,
+                include=['id', 'producer', 'total_area', 'arable_area', 'vegetation_area'],
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -50,6 +77,10 @@ class Crop(BaseModel):
 
     class Meta:
         db_table = 'crops'
+        indexes = [
+            GinIndex(fields=['name'], name='crops_name_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['name', 'id'], name='crops_active_name', condition=ACTIVE_ROWS),
+        ]
 
     def __str__(self):
         return self.name
@@ -57,12 +88,18 @@ class Crop(BaseModel):
 
 class Harvest(BaseModel):
     year = models.CharField(max_length=4)  # Example: 2021
+    # Keeps its own index for the soft delete cascades, as Farm.producer does
     farm = models.ForeignKey(
         Farm, related_name="harvests", on_delete=models.CASCADE
     )
 
     class Meta:
         db_table = 'harvests'
+        indexes = [
+            models.Index(fields=['year', 'id'], name='harvests_active_year', condition=ACTIVE_ROWS),
+            models.Index(fields=['farm', 'year', 'id'], name='harvests_active_farm', condition=ACTIVE_ROWS),
+            models.Index(fields=['year', 'farm'], name='harvests_active_year_farm', condition=ACTIVE_ROWS),
+        ]
 
     def __str__(self):
         return f"{self.year} - {self.farm.name}"
@@ -73,15 +110,21 @@ class Harvest(BaseModel):
 
 
 class PlantedCrop(BaseModel):
+    # Nothing sits under planted crops, so only active rows are looked up by
+    # these keys and the partial indexes below serve them
     harvest = models.ForeignKey(
-        Harvest, related_name="planted_crops", on_delete=models.CASCADE
+        Harvest, related_name="planted_crops", on_delete=models.CASCADE, db_index=False
     )
     crop = models.ForeignKey(
-        Crop, related_name="planted_crops", on_delete=models.CASCADE
+        Crop, related_name="planted_crops", on_delete=models.CASCADE, db_index=False
     )
 
     class Meta:
         db_table = 'planted_crops'
+        indexes = [
+            models.Index(fields=['harvest', 'id'], name='planted_crops_active_harvest', condition=ACTIVE_ROWS),
+            models.Index(fields=['crop', 'harvest', 'id'], name='planted_crops_active_crop', condition=ACTIVE_ROWS),
+        ]
 
     def __str__(self):
         return f"{self.crop.name} ({self.harvest.year})"
@@ -97,3 +140,27 @@ class PlantedCrop(BaseModel):
     @property
     def farm_name(self):
         return self.harvest.farm.name
+
+
+class StateSummary(models.Model):
+    """Active farm count and area sums per state, kept current by triggers on farms."""
+    state = models.CharField(max_length=2, primary_key=True)
+    farm_count = models.BigIntegerField(default=0)
+    total_area = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    arable_area = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    vegetation_area = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = 'dashboard_state_summary'
+
+
+class CropSummary(models.Model):
+    """Active planted crop count per crop, kept current by triggers on planted_crops."""
+    # No database constraint: the triggers write rows for any crop id they see
+    crop = models.OneToOneField(
+        Crop, primary_key=True, related_name='summary', on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    planted_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'dashboard_crop_summary'
@@ -1,7 +1,15 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 from producer.models import Producer, Farm, Crop, Harvest, PlantedCrop
 
+UNIQUE_CPF_CNPJ = 'producers_active_cpf_cnpj_digits'
+
+
+def is_duplicate_cpf_cnpj(error):
+    """Whether an IntegrityError comes from the active CPF/CNPJ unique index."""
+    return getattr(getattr(error.__cause__, 'diag', None), 'constraint_name', None) == UNIQUE_CPF_CNPJ
+
 
 class ProducerSerializer(serializers.ModelSerializer):
 
@@ -10,21 +18,28 @@ class ProducerSerializer(serializers.ModelSerializer):
         fields = ['cpf_cnpj', 'name', 'id', 'created_at', 'updated_at']
         read_only_fields = ('id', 'created_at', 'updated_at')
 
-    def validate_cpf_cnpj(self, value):
+    def save(self, **kwargs):
         """
-        Valida que o CPF/CNPJ é único entre os produtores que não estão com is_deleted=True,
-        ignorando a instância atual ao atualizar.
+        O CPF/CNPJ é único entre os produtores que não estão com is_deleted=True,
+        garantido pelo índice único parcial sobre os dígitos do documento.
         """
-        queryset = Producer.objects.filter(cpf_cnpj=value, is_deleted=False)
-        if self.instance:
-            # Exclui a instância atual da validação
-            queryset = queryset.exclude(id=self.instance.id)
-
-        if queryset.exists():
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            if not is_duplicate_cpf_cnpj(error):
+                raise
             raise serializers.ValidationError(
-                _("CPF/CNPJ já está em uso para um produtor ativo.")
+                {'cpf_cnpj': [_("CPF/CNPJ já está em uso para um produtor ativo.")]}
             )
-        return value
+
+
+class ProducerBulkItemSerializer(serializers.ModelSerializer):
+    """One producer of a bulk request; uniqueness is checked for the whole batch."""
+
+    class Meta:
+        model = Producer
+        fields = ['cpf_cnpj', 'name']
 
 
 class FarmSerializer(serializers.ModelSerializer):
@@ -63,8 +78,18 @@ class FarmSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         return super().create(validated_data)
 
-    def update(self, instance, validated_data):
-        return super().update(instance, validated_data)
+
+class FarmBulkItemSerializer(serializers.ModelSerializer):
+    """
+    One farm of a bulk upsert. Ids and producers are plain UUIDs here; the
+    batch resolves them and checks the areas together.
+    """
+    id = serializers.UUIDField(required=False)
+    producer = serializers.UUIDField()
+
+    class Meta:
+        model = Farm
+        fields = ['id', 'name', 'city', 'state', 'total_area', 'arable_area', 'vegetation_area', 'producer']
 
 
 class CropSerializer(serializers.ModelSerializer):
@@ -89,3 +114,30 @@ class PlantedCropSerializer(serializers.ModelSerializer):
         model = PlantedCrop
         fields = ['id', 'harvest', 'crop', 'crop_name', 'harvest_year', 'farm_name', 'created_at', 'updated_at']
         read_only_fields = ('id', 'crop_name', 'harvest_year', 'farm_name', 'created_at', 'updated_at')
+
+
+class HarvestCropsSerializer(serializers.Serializer):
+    """The complete list of crops planted in a harvest."""
+    crops = serializers.ListField(child=serializers.UUIDField(), allow_empty=True)
+
+    def validate_crops(self, value):
+        crop_ids = list(dict.fromkeys(value))
+        found = set(Crop.objects.filter(id__in=crop_ids).values_list('id', flat=True))
+        missing = [str(crop_id) for crop_id in crop_ids if crop_id not in found]
+        if missing:
+            raise serializers.ValidationError(_("Crops not found: %(ids)s.") % {'ids': ', '.join(missing)})
+        return crop_ids
+
+
+class DashboardFilterSerializer(serializers.Serializer):
+    """Optional slice of the dashboard; omitted fields are not filtered on."""
+    FRESH = 'fresh'
+    STALE = 'stale'
+
+    freshness = serializers.ChoiceField(choices=[FRESH, STALE], default=FRESH)
+    state = serializers.CharField(max_length=2, required=False)
+    producer = serializers.UUIDField(required=False)
+    year = serializers.CharField(max_length=4, required=False)
+
+    def validate_state(self, value):
+        return value.upper()
@@ -0,0 +1,42 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from user.models import Role
+
+ADMIN_ROLE_ID = 'bdb80a3e-7458-4548-95f7-1b84c7b79cda'
+
+
+class AdminApiTestCase(TestCase):
+    """Base for tests that call the API as an authenticated admin."""
+    fixtures = ['roles.json']
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_user(
+            email='admin@example.com',
+            password='testpass123',
+            name='Admin User',
+            cpf='111.111.111-11',
+        )
+        self.admin_user.roles.add(Role.objects.get(pk=ADMIN_ROLE_ID))
+        # Load the memoized roles now so query counts only cover the request
+        self.admin_user.role_names
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+
+class SharedCacheMixin:
+    """Keep the caches in files, which every process sees as they see the deployed cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        location = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, location, ignore_errors=True)
+        shared = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        })
+        shared.enable()
+        cls.addClassCleanup(shared.disable)
+        super().setUpClass()
@@ -0,0 +1,268 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from producer.models import Crop, Farm, Harvest, PlantedCrop, Producer
+from producer.tests import AdminApiTestCase
+
+BULK_CREATE_PRODUCER_URL = reverse('producer:bulk_create_producer')
+BULK_UPSERT_FARM_URL = reverse('producer:bulk_upsert_farm')
+
+
+def make_cpf(number):
+    """Return a valid formatted CPF built from a 9 digit number."""
+    digits = f'{number:09d}'
+    for size in (9, 10):
+        total = sum(int(digit) * weight for digit, weight in zip(digits, range(size + 1, 1, -1)))
+        digits += str(total * 10 % 11 % 10)
+    return f'{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}'
+
+
+class PublicProducerBulkApiTests(TestCase):
+    """Test the public access to the producer bulk API."""
+
+    def test_authentication_required(self):
+        """Test that authentication is required to access the API."""
+        res = APIClient().post(BULK_CREATE_PRODUCER_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateProducerBulkApiTests(AdminApiTestCase):
+    """Test authenticated access to the producer bulk API."""
+
+    def setUp(self):
+        super().setUp()
+
+    def post(self, items):
+        return self.client.post(BULK_CREATE_PRODUCER_URL, items, format='json')
+
+    def test_bulk_create_producers(self):
+        """Test creating every producer of the batch."""
+        items = [{'name': f'Producer {index}', 'cpf_cnpj': make_cpf(100000 + index)} for index in range(3)]
+
+        res = self.post(items)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 3)
+        self.assertEqual(
+            sorted(str(result['id']) for result in res.data['results']),
+            sorted(str(pk) for pk in Producer.objects.values_list('id', flat=True)),
+        )
+        self.assertEqual(Producer.objects.get(id=res.data['results'][0]['id']).cpf_cnpj_digits, '00010000046')
+
+    def test_bulk_create_reports_each_failure(self):
+        """Test invalid, repeated and already registered documents fail only their own items."""
+        Producer.objects.create(name='Existing', cpf_cnpj=make_cpf(1))
+        items = [
+            {'name': 'Valid', 'cpf_cnpj': make_cpf(2)},
+            {'name': 'Invalid', 'cpf_cnpj': '123'},
+            {'name': 'Repeated', 'cpf_cnpj': make_cpf(2).replace('.', '').replace('-', '')},
+            {'name': 'Registered', 'cpf_cnpj': make_cpf(1)},
+            {'cpf_cnpj': make_cpf(3)},
+        ]
+
+        res = self.post(items)
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((res.data['created'], res.data['updated'], res.data['failed']), (1, 0, 4))
+        results = res.data['results']
+        self.assertEqual(results[0]['status'], 'created')
+        self.assertIn('cpf_cnpj', results[1]['errors'])
+        self.assertIn('cpf_cnpj', results[2]['errors'])
+        self.assertIn('cpf_cnpj', results[3]['errors'])
+        self.assertIn('name', results[4]['errors'])
+        self.assertEqual([result['index'] for result in results], list(range(5)))
+        self.assertEqual(Producer.objects.count(), 2)
+
+    def test_bulk_create_all_failed(self):
+        """Test a batch without a single valid item is rejected."""
+        res = self.post([{'name': 'Invalid', 'cpf_cnpj': '123'}])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['failed'], 1)
+
+    def test_bulk_create_requires_a_list(self):
+        """Test the body must be a JSON array."""
+        res = self.post({'name': 'Producer', 'cpf_cnpj': make_cpf(1)})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_limits_batch_size(self):
+        """Test batches above BULK_MAX_ITEMS are rejected."""
+        with self.settings(BULK_MAX_ITEMS=2):
+            res = self.post([{'name': f'Producer {index}', 'cpf_cnpj': make_cpf(index)} for index in range(3)])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Producer.objects.exists())
+
+    def test_bulk_create_query_count_does_not_grow_with_batch(self):
+        """Test the batch is checked in one query and inserted in chunks."""
+        with CaptureQueriesContext(connection) as small:
+            self.post([{'name': f'Producer {index}', 'cpf_cnpj': make_cpf(index)} for index in range(1, 11)])
+        with CaptureQueriesContext(connection) as large, self.settings(BULK_WRITE_BATCH_SIZE=10000):
+            res = self.post([{'name': f'Producer {index}', 'cpf_cnpj': make_cpf(index)} for index in range(11, 2011)])
+
+        self.assertEqual(res.data['created'], 2000)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+
+class PrivateFarmBulkApiTests(AdminApiTestCase):
+    """Test authenticated access to the farm bulk upsert API."""
+
+    def setUp(self):
+        super().setUp()
+        self.producer = Producer.objects.create(name='Producer 1', cpf_cnpj=make_cpf(1))
+
+    def farm_payload(self, **params):
+        payload = {
+            'name': 'Farm',
+            'city': 'City',
+            'state': 'SP',
+            'total_area': '100.00',
+            'arable_area': '70.00',
+            'vegetation_area': '30.00',
+            'producer': str(self.producer.id),
+        }
+        payload.update(params)
+        return payload
+
+    def post(self, items):
+        return self.client.post(BULK_UPSERT_FARM_URL, items, format='json')
+
+    def test_bulk_upsert_creates_and_updates(self):
+        """Test farms without an id are created and farms with an id are updated."""
+        farm = Farm.objects.create(**{**self.farm_payload(name='Old'), 'producer': self.producer})
+
+        res = self.post([self.farm_payload(name='New'), self.farm_payload(id=str(farm.id), name='Renamed')])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((res.data['created'], res.data['updated']), (1, 1))
+        farm.refresh_from_db()
+        self.assertEqual(farm.name, 'Renamed')
+        self.assertGreater(farm.updated_at, farm.created_at)
+        self.assertTrue(Farm.objects.filter(id=res.data['results'][0]['id'], name='New').exists())
+
+    def test_bulk_upsert_reports_each_failure(self):
+        """Test area, producer, id and field errors fail only their own rows."""
+        deleted = Farm.objects.create(**{**self.farm_payload(), 'producer': self.producer, 'is_deleted': True})
+        items = [
+            self.farm_payload(name='Valid'),
+            self.farm_payload(arable_area='80.00'),
+            self.farm_payload(producer='00000000-0000-0000-0000-000000000000'),
+            self.farm_payload(id=str(deleted.id)),
+            self.farm_payload(total_area='-1'),
+            self.farm_payload(arable_area='80.00', producer='00000000-0000-0000-0000-000000000000'),
+        ]
+
+        res = self.post(items)
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        results = res.data['results']
+        self.assertEqual([result['status'] for result in results], ['created'] + ['failed'] * 5)
+        self.assertIn('non_field_errors', results[1]['errors'])
+        self.assertIn('producer', results[2]['errors'])
+        self.assertIn('id', results[3]['errors'])
+        self.assertIn('total_area', results[4]['errors'])
+        self.assertEqual(set(results[5]['errors']), {'non_field_errors', 'producer'})
+        self.assertEqual(Farm.objects.count(), 1)
+
+    def test_bulk_upsert_rejects_repeated_ids(self):
+        """Test a farm cannot be updated twice in one batch."""
+        farm = Farm.objects.create(**{**self.farm_payload(), 'producer': self.producer})
+
+        res = self.post([self.farm_payload(id=str(farm.id), name='A'), self.farm_payload(id=str(farm.id), name='B')])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        farm.refresh_from_db()
+        self.assertEqual(farm.name, 'Farm')
+
+    def test_bulk_upsert_query_count_does_not_grow_with_batch(self):
+        """Test producers and farms are resolved once per batch."""
+        farms = [Farm.objects.create(**{**self.farm_payload(), 'producer': self.producer}) for _ in range(2)]
+
+        def batch(size):
+            return [self.farm_payload(name=f'Farm {index}') for index in range(size)] + [
+                self.farm_payload(id=str(farm.id), name='Updated') for farm in farms
+            ]
+
+        with CaptureQueriesContext(connection) as small:
+            self.post(batch(2))
+        with CaptureQueriesContext(connection) as large:
+            res = self.post(batch(500))
+
+        self.assertEqual(res.data['created'], 500)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+
+class PrivateHarvestCropsApiTests(AdminApiTestCase):
+    """Test setting the crops of a harvest."""
+
+    def setUp(self):
+        super().setUp()
+        producer = Producer.objects.create(name='Producer 1', cpf_cnpj=make_cpf(1))
+        farm = Farm.objects.create(
+            name='Farm 1', city='City', state='SP', total_area=100, arable_area=70, vegetation_area=30,
+            producer=producer,
+        )
+        self.harvest = Harvest.objects.create(year='2023', farm=farm)
+        self.soy, self.corn, self.coffee = (Crop.objects.create(name=name) for name in ('Soja', 'Milho', 'Café'))
+        self.url = reverse('producer:harvest_crops', kwargs={'id': self.harvest.id})
+
+    def active_crops(self):
+        return sorted(PlantedCrop.objects.filter(harvest=self.harvest).values_list('crop__name', flat=True))
+
+    def test_set_harvest_crops(self):
+        """Test the harvest ends with exactly the requested crops."""
+        PlantedCrop.objects.create(harvest=self.harvest, crop=self.soy)
+        PlantedCrop.objects.create(harvest=self.harvest, crop=self.corn)
+
+        res = self.client.put(self.url, {'crops': [str(self.corn.id), str(self.coffee.id)]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['added'], [self.coffee.id])
+        self.assertEqual(res.data['removed'], [self.soy.id])
+        self.assertEqual(self.active_crops(), ['Café', 'Milho'])
+        self.assertTrue(PlantedCrop.all_objects.filter(harvest=self.harvest, crop=self.soy, is_deleted=True).exists())
+
+    def test_set_harvest_crops_is_idempotent(self):
+        """Test repeating the call changes nothing."""
+        payload = {'crops': [str(self.soy.id), str(self.soy.id), str(self.corn.id)]}
+        self.client.put(self.url, payload, format='json')
+
+        res = self.client.put(self.url, payload, format='json')
+
+        self.assertEqual((res.data['added'], res.data['removed']), ([], []))
+        self.assertEqual(self.active_crops(), ['Milho', 'Soja'])
+        self.assertEqual(PlantedCrop.all_objects.count(), 2)
+
+    def test_set_harvest_crops_collapses_duplicate_rows(self):
+        """Test duplicate rows of a kept crop are soft deleted."""
+        PlantedCrop.objects.create(harvest=self.harvest, crop=self.soy)
+        PlantedCrop.objects.create(harvest=self.harvest, crop=self.soy)
+
+        res = self.client.put(self.url, {'crops': [str(self.soy.id)]}, format='json')
+
+        self.assertEqual(res.data['removed'], [])
+        self.assertEqual(self.active_crops(), ['Soja'])
+
+    def test_set_harvest_crops_unknown_crop(self):
+        """Test unknown crops reject the whole call."""
+        PlantedCrop.objects.create(harvest=self.harvest, crop=self.soy)
+
+        res = self.client.put(
+            self.url, {'crops': [str(self.corn.id), '00000000-0000-0000-0000-000000000000']}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.active_crops(), ['Soja'])
+
+    def test_set_harvest_crops_unknown_harvest(self):
+        """Test a missing harvest returns 404."""
+        url = reverse('producer:harvest_crops', kwargs={'id': '00000000-0000-0000-0000-000000000000'})
+
+        res = self.client.put(url, {'crops': []}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,112 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase
+
+from producer.aggregates import find_drift
+from producer.analytics import REFRESH_LOCK_ID, dashboard_data_stale
+from producer.cache import dashboard_cache
+from producer.models import Farm, Producer, StateSummary
+
+
+class BenchmarkSearchTests(TestCase):
+    """Test the benchmark_search command."""
+
+    def test_benchmark_search(self):
+        """Test the benchmark reports plans for both lookups and leaves no seeded rows."""
+        out = StringIO()
+
+        call_command('benchmark_search', rows=2000, stdout=out)
+
+        self.assertIn('name icontains:', out.getvalue())
+        self.assertIn('cpf_cnpj filter:', out.getvalue())
+        self.assertFalse(Producer.objects.exists())
+
+
+class ReconcileDashboardTests(TestCase):
+    """Test the reconcile_dashboard command."""
+
+    def setUp(self):
+        producer = Producer.objects.create(name='Producer 1', cpf_cnpj='18.200.327/0001-72')
+        Farm.objects.create(
+            name='Fazenda', city='City', state='SP', total_area=100, arable_area=70, vegetation_area=30,
+            producer=producer,
+        )
+
+    def test_check_passes_without_drift(self):
+        out = StringIO()
+
+        call_command('reconcile_dashboard', check=True, stdout=out)
+
+        self.assertIn('Dashboard summaries match.', out.getvalue())
+
+    def test_check_reports_drift(self):
+        StateSummary.objects.filter(state='SP').update(farm_count=7)
+        StateSummary.objects.create(state='MG', farm_count=1)
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_dashboard', check=True, stdout=StringIO())
+
+    def test_rebuild_fixes_drift(self):
+        StateSummary.objects.filter(state='SP').update(farm_count=7)
+        out = StringIO()
+
+        call_command('reconcile_dashboard', stdout=out)
+
+        self.assertIn('1 rows had drifted', out.getvalue())
+        self.assertEqual(StateSummary.objects.get(state='SP').farm_count, 1)
+        self.assertEqual(find_drift(), [])
+
+
+class BenchmarkDashboardTests(TestCase):
+    """Test the benchmark_dashboard command."""
+
+    def test_benchmark_dashboard(self):
+        """Test the benchmark times both paths at every step and leaves no seeded rows."""
+        out = StringIO()
+
+        call_command('benchmark_dashboard', farms=[100, 300], crops=5, repeat=2, stdout=out)
+
+        for farms in (100, 300):
+            self.assertIn(f'{farms} farms, single statement:', out.getvalue())
+            self.assertIn(f'{farms} farms, legacy aggregation:', out.getvalue())
+        self.assertFalse(Farm.all_objects.exists())
+        self.assertFalse(StateSummary.objects.exclude(farm_count=0).exists())
+
+
+class RefreshAnalyticsTests(TestCase):
+    """Test the refresh_analytics command."""
+
+    def test_refresh_analytics(self):
+        """Test the views pick up new farms and only cached stale dashboards are invalidated."""
+        producer = Producer.objects.create(name='Producer 1', cpf_cnpj='18.200.327/0001-72')
+        Farm.objects.create(
+            name='Fazenda', city='City', state='SP', total_area=100, arable_area=70, vegetation_area=30,
+            producer=producer,
+        )
+        version, stale_version = dashboard_cache.version(), dashboard_cache.version(stale=True)
+        out = StringIO()
+
+        call_command('refresh_analytics', stdout=out)
+
+        self.assertIn('Refreshed analytics views', out.getvalue())
+        self.assertEqual(dashboard_data_stale(state='SP')['farms_by_state'], [{'state': 'SP', 'count': 1}])
+        self.assertEqual(dashboard_cache.version(), version)
+        self.assertNotEqual(dashboard_cache.version(stale=True), stale_version)
+
+    def test_refresh_analytics_skips_while_locked(self):
+        """Test a refresh is skipped while another process holds the refresh lock."""
+        other = connections.create_connection(DEFAULT_DB_ALIAS)
+        stale_version = dashboard_cache.version(stale=True)
+        out = StringIO()
+        try:
+            with other.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_lock(%s)', [REFRESH_LOCK_ID])
+            call_command('refresh_analytics', stdout=out)
+        finally:
+            other.close()
+
+        self.assertIn('skipped', out.getvalue())
+        self.assertEqual(dashboard_cache.version(stale=True), stale_version)
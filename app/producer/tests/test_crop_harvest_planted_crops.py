@@ -1,11 +1,10 @@
 from django.test import TestCase
 from django.urls import reverse
-from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
 from producer.models import Crop, Harvest, PlantedCrop, Farm, Producer
 from producer.serializers import CropSerializer, HarvestSerializer, PlantedCropSerializer
-from user.models import Role
+from producer.tests import AdminApiTestCase
 
 LIST_CREATE_CROP_URL = reverse('producer:list_create_crop')
 LIST_CREATE_HARVEST_URL = reverse('producer:list_create_harvest')
@@ -24,11 +23,6 @@ def planted_crop_detail_url(planted_crop_id):
     return reverse('producer:update_retrieve_planted_crop', kwargs={'id': planted_crop_id})
 
 
-def create_user(**params):
-    """Create and return a new user."""
-    return get_user_model().objects.create_user(**params)
-
-
 class PublicCropApiTests(TestCase):
     """Test public access to the Crop API."""
 
@@ -41,23 +35,11 @@ class PublicCropApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateCropApiTests(TestCase):
+class PrivateCropApiTests(AdminApiTestCase):
     """Test authenticated access to the Crop API."""
 
-    fixtures = ['roles.json']
-
     def setUp(self):
-        role_admin = Role.objects.get(pk='bdb80a3e-7458-4548-95f7-1b84c7b79cda')
-        self.admin_user = create_user(
-            email='admin@example.com',
-            password='testpass123',
-            name='Admin User',
-            cpf='111.111.111-11',
-        )
-        self.admin_user.roles.add(role_admin)
-        self.admin_user.save()
-        self.client = APIClient()
-        self.client.force_authenticate(user=self.admin_user)
+        super().setUp()
 
     def test_list_crops(self):
         """Test listing crops."""
@@ -72,6 +54,14 @@ class PrivateCropApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['results'], serializer.data)
 
+    def test_list_crops_query_count(self):
+        """Test listing crops runs a constant number of queries."""
+        for index in range(10):
+            Crop.objects.create(name=f'Crop {index}')
+
+        with self.assertNumQueries(2):
+            self.client.get(LIST_CREATE_CROP_URL)
+
     def test_create_crop(self):
         """Test creating a new crop."""
         payload = {'name': 'Wheat'}
@@ -82,23 +72,11 @@ class PrivateCropApiTests(TestCase):
         self.assertEqual(crop.name, payload['name'])
 
 
-class PrivateHarvestApiTests(TestCase):
+class PrivateHarvestApiTests(AdminApiTestCase):
     """Test authenticated access to the Harvest API."""
 
-    fixtures = ['roles.json']
-
     def setUp(self):
-        role_admin = Role.objects.get(pk='bdb80a3e-7458-4548-95f7-1b84c7b79cda')
-        self.admin_user = create_user(
-            email='admin@example.com',
-            password='testpass123',
-            name='Admin User',
-            cpf='111.111.111-11',
-        )
-        self.admin_user.roles.add(role_admin)
-        self.admin_user.save()
-        self.client = APIClient()
-        self.client.force_authenticate(user=self.admin_user)
+        super().setUp()
         self.producer = Producer.objects.create(name='Producer 1', cpf_cnpj='123.456.789-01')
 
     def test_list_harvests(self):
@@ -123,6 +101,25 @@ class PrivateHarvestApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['results'], serializer.data)
 
+    def test_list_harvests_query_count(self):
+        """Test listing harvests loads farms without extra queries."""
+        for index in range(10):
+            farm = Farm.objects.create(
+                name=f'Farm {index}',
+                city='City',
+                state='SP',
+                total_area=100,
+                arable_area=70,
+                vegetation_area=30,
+                producer=self.producer
+            )
+            Harvest.objects.create(year=str(2000 + index), farm=farm)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(LIST_CREATE_HARVEST_URL)
+
+        self.assertEqual(res.data['results'][0]['farm_name'], 'Farm 0')
+
     def test_create_harvest(self):
         """Test creating a new harvest."""
         farm = Farm.objects.create(
@@ -142,23 +139,11 @@ class PrivateHarvestApiTests(TestCase):
         self.assertEqual(harvest.year, payload['year'])
 
 
-class PrivatePlantedCropApiTests(TestCase):
+class PrivatePlantedCropApiTests(AdminApiTestCase):
     """Test authenticated access to the PlantedCrop API."""
 
-    fixtures = ['roles.json']
-
     def setUp(self):
-        role_admin = Role.objects.get(pk='bdb80a3e-7458-4548-95f7-1b84c7b79cda')
-        self.admin_user = create_user(
-            email='admin@example.com',
-            password='testpass123',
-            name='Admin User',
-            cpf='111.111.111-11',
-        )
-        self.admin_user.roles.add(role_admin)
-        self.admin_user.save()
-        self.client = APIClient()
-        self.client.force_authenticate(user=self.admin_user)
+        super().setUp()
         self.producer = Producer.objects.create(name='Producer 1', cpf_cnpj='123.456.789-01')
 
     def test_list_planted_crops(self):
@@ -184,6 +169,51 @@ class PrivatePlantedCropApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['results'], serializer.data)
 
+    def test_list_planted_crops_query_count(self):
+        """Test listing planted crops loads crops, harvests and farms without extra queries."""
+        for index in range(10):
+            crop = Crop.objects.create(name=f'Crop {index}')
+            farm = Farm.objects.create(
+                name=f'Farm {index}',
+                city='City',
+                state='SP',
+                total_area=100,
+                arable_area=70,
+                vegetation_area=30,
+                producer=self.producer
+            )
+            harvest = Harvest.objects.create(year=str(2000 + index), farm=farm)
+            PlantedCrop.objects.create(harvest=harvest, crop=crop)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(LIST_CREATE_PLANTED_CROP_URL)
+
+        self.assertEqual(len(res.data['results']), 10)
+        self.assertTrue(all(item['farm_name'] and item['crop_name'] for item in res.data['results']))
+
+    def test_list_planted_crops_cursor_pagination(self):
+        """Test cursor pages over the harvest ordering skip no rows and skip the count query."""
+        farm = Farm.objects.create(
+            name='Farm 1',
+            city='City',
+            state='SP',
+            total_area=100,
+            arable_area=70,
+            vegetation_area=30,
+            producer=self.producer
+        )
+        harvest = Harvest.objects.create(year='2023', farm=farm)
+        for index in range(5):
+            PlantedCrop.objects.create(harvest=harvest, crop=Crop.objects.create(name=f'Crop {index}'))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(LIST_CREATE_PLANTED_CROP_URL, {'pagination': 'cursor', 'page_size': 3})
+        res_next = self.client.get(LIST_CREATE_PLANTED_CROP_URL, {'cursor': res.data['next'], 'page_size': 3})
+
+        ids = [item['id'] for item in res.data['results'] + res_next.data['results']]
+        self.assertEqual(sorted(ids), sorted(str(pk) for pk in PlantedCrop.objects.values_list('id', flat=True)))
+        self.assertIsNone(res_next.data['next'])
+
     def test_create_planted_crop(self):
         """Test creating a new planted crop."""
         crop = Crop.objects.create(name='Soybean')
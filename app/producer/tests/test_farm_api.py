@@ -1,12 +1,11 @@
 from django.test import TestCase
 from django.urls import reverse
-from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
 from producer.models import Producer
 from producer.models import Farm
 from producer.serializers import FarmSerializer
-from user.models import Role
+from producer.tests import AdminApiTestCase
 
 
 LIST_CREATE_FARM_URL = reverse('producer:list_create_farm')
@@ -17,11 +16,6 @@ def detail_url(farm_id):
     return reverse('producer:update_retrieve_farm', kwargs={'id': farm_id})
 
 
-def create_user(**params):
-    """Create and return a new user."""
-    return get_user_model().objects.create_user(**params)
-
-
 class PublicFarmApiTests(TestCase):
     """Test the public access to the farm API."""
 
@@ -35,27 +29,13 @@ class PublicFarmApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateFarmApiTests(TestCase):
+class PrivateFarmApiTests(AdminApiTestCase):
     """Test authenticated access to the farm API."""
 
-    fixtures = ['roles.json']
-
     def setUp(self):
-        role_admin = Role.objects.get(pk='bdb80a3e-7458-4548-95f7-1b84c7b79cda')
+        super().setUp()
         self.producer = Producer.objects.create(name='Producer 1', cpf_cnpj='123.456.789-01')
 
-        self.admin_user = create_user(
-            email='admin@example.com',
-            password='testpass123',
-            name='Admin User',
-            cpf='111.111.111-11',
-        )
-        self.admin_user.roles.add(role_admin)
-        self.admin_user.save()
-
-        self.client = APIClient()
-        self.client.force_authenticate(user=self.admin_user)
-
     def test_list_farms(self):
         """Test listing farms."""
         Farm.objects.create(
@@ -79,12 +59,31 @@ class PrivateFarmApiTests(TestCase):
 
         res = self.client.get(LIST_CREATE_FARM_URL)
 
-        farms = Farm.objects.all()
+        farms = Farm.objects.order_by('name')
         serializer = FarmSerializer(farms, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['results'], serializer.data)
 
+    def test_list_farms_query_count(self):
+        """Test listing farms loads producers without extra queries."""
+        for index in range(10):
+            producer = Producer.objects.create(name=f'Producer {index}', cpf_cnpj=f'{index:011d}')
+            Farm.objects.create(
+                name=f'Farm {index}',
+                city='City',
+                state='SP',
+                total_area=100.0,
+                arable_area=70.0,
+                vegetation_area=30.0,
+                producer=producer
+            )
+
+        with self.assertNumQueries(2):
+            res = self.client.get(LIST_CREATE_FARM_URL)
+
+        self.assertEqual(res.data['results'][0]['producer_name'], 'Producer 0')
+
     def test_create_farm(self):
         """Test creating a new farm."""
         payload = {
@@ -162,7 +161,7 @@ class PrivateFarmApiTests(TestCase):
         res = self.client.delete(url)
 
         farm.refresh_from_db()
-        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertTrue(farm.is_deleted)
 
     def test_list_farms_with_filter(self):
@@ -1,20 +1,18 @@
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from django.urls import reverse
-from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
-from producer.models import Producer
-from user.models import Role
+from producer.models import Crop, Farm, Harvest, PlantedCrop, Producer
+from producer.tests import AdminApiTestCase
 from producer.serializers import ProducerSerializer
 
 LIST_CREATE_PRODUCER_URL = reverse('producer:list_create_producer')
 
 
-def create_user(**params):
-    """Create and return a new user."""
-    return get_user_model().objects.create_user(**params)
-
-
 def detail_url(producer_id):
     """Return the URL for a specific producer."""
     return reverse('producer:update_retrieve_producer', kwargs={'id': producer_id})
@@ -33,23 +31,11 @@ class PublicProducerApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateProducerApiTests(TestCase):
+class PrivateProducerApiTests(AdminApiTestCase):
     """Test authenticated access to the producer API."""
-    fixtures = ['roles.json']
 
     def setUp(self):
-        role_admin = Role.objects.get(pk='bdb80a3e-7458-4548-95f7-1b84c7b79cda')
-        self.admin_user = create_user(
-            email='admin@example.com',
-            password='testpass123',
-            name='Admin User',
-            cpf='111.111.111-11',
-        )
-        self.admin_user.roles.add(role_admin)
-        self.admin_user.save()
-
-        self.client = APIClient()
-        self.client.force_authenticate(user=self.admin_user)
+        super().setUp()
 
     def test_list_producers(self):
         """Test listing producers."""
@@ -64,6 +50,130 @@ class PrivateProducerApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data['results'], serializer.data)
 
+    def test_list_producers_query_count(self):
+        """Test listing producers runs a constant number of queries."""
+        for index in range(10):
+            Producer.objects.create(name=f'Producer {index}', cpf_cnpj=f'{index:011d}')
+
+        with self.assertNumQueries(2):
+            self.client.get(LIST_CREATE_PRODUCER_URL)
+
+    def test_list_producers_cursor_pagination(self):
+        """Test walking producers with cursors, ties broken by id."""
+        for index in range(5):
+            Producer.objects.create(name=f'Producer {index % 2}', cpf_cnpj=f'{index:011d}')
+        expected = list(Producer.objects.order_by('name', 'id').values_list('id', flat=True))
+
+        seen = []
+        params = {'pagination': 'cursor', 'page_size': 2}
+        while True:
+            res = self.client.get(LIST_CREATE_PRODUCER_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertIsNone(res.data['count'])
+            seen.extend(item['id'] for item in res.data['results'])
+            if res.data['next'] is None:
+                break
+            params = {'cursor': res.data['next'], 'page_size': 2}
+
+        self.assertEqual(seen, [str(pk) for pk in expected])
+
+        res = self.client.get(LIST_CREATE_PRODUCER_URL, {'cursor': res.data['previous'], 'page_size': 2})
+        self.assertEqual([item['id'] for item in res.data['results']], [str(pk) for pk in expected[2:4]])
+        self.assertIsNotNone(res.data['previous'])
+
+    def test_list_producers_cursor_descending_ordering(self):
+        """Test cursor pagination honours a descending ordering."""
+        for index in range(3):
+            Producer.objects.create(name=f'Producer {index}', cpf_cnpj=f'{index:011d}')
+
+        res = self.client.get(LIST_CREATE_PRODUCER_URL, {'pagination': 'cursor', 'ordering': '-name', 'page_size': 2})
+        res_next = self.client.get(LIST_CREATE_PRODUCER_URL, {'cursor': res.data['next'], 'ordering': '-name'})
+
+        names = [item['name'] for item in res.data['results'] + res_next.data['results']]
+        self.assertEqual(names, ['Producer 2', 'Producer 1', 'Producer 0'])
+        self.assertIsNone(res_next.data['next'])
+
+    def test_list_producers_cursor_sub_millisecond_timestamps(self):
+        """Test cursors keep microseconds, so rows within one millisecond are neither repeated nor skipped."""
+        base = datetime(2024, 1, 1, 12, 0, 0, 123000, tzinfo=timezone.utc)
+        for index in range(6):
+            producer = Producer.objects.create(name=f'Producer {index}', cpf_cnpj=f'{index:011d}')
+            Producer.objects.filter(pk=producer.pk).update(created_at=base + timedelta(microseconds=150 * index))
+        expected = list(Producer.objects.order_by('created_at', 'id').values_list('id', flat=True))
+
+        seen = []
+        params = {'pagination': 'cursor', 'ordering': 'created_at', 'page_size': 2}
+        # Bounded: a truncated cursor would return the same page forever
+        for _page in range(len(expected)):
+            res = self.client.get(LIST_CREATE_PRODUCER_URL, params)
+            seen.extend(item['id'] for item in res.data['results'])
+            if res.data['next'] is None:
+                break
+            params = {'cursor': res.data['next'], 'ordering': 'created_at', 'page_size': 2}
+
+        self.assertEqual(seen, [str(pk) for pk in expected])
+
+    def test_list_producers_invalid_cursor(self):
+        """Test an invalid cursor returns 404."""
+        res = self.client.get(LIST_CREATE_PRODUCER_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_producers_reports_exact_count_by_default(self):
+        """Test the default count strategy is exact."""
+        Producer.objects.create(name='Producer 1', cpf_cnpj='18.200.327/0001-72')
+
+        res = self.client.get(LIST_CREATE_PRODUCER_URL)
+
+        self.assertEqual(res.data['count'], 1)
+        self.assertEqual(res.data['count_strategy'], 'exact')
+
+    def test_list_producers_without_count(self):
+        """Test ?count=none skips the count query and still links the next page."""
+        for index in range(3):
+            Producer.objects.create(name=f'Producer {index}', cpf_cnpj=f'{index:011d}')
+
+        with self.assertNumQueries(1):
+            res = self.client.get(LIST_CREATE_PRODUCER_URL, {'count': 'none', 'page_size': 2})
+        res_last = self.client.get(LIST_CREATE_PRODUCER_URL, {'count': 'none', 'page_size': 2, 'page': 2})
+
+        self.assertIsNone(res.data['count'])
+        self.assertEqual(res.data['count_strategy'], 'none')
+        self.assertEqual(res.data['next'], '2')
+        self.assertEqual(len(res_last.data['results']), 1)
+        self.assertIsNone(res_last.data['next'])
+        self.assertEqual(res_last.data['previous'], '1')
+
+    def test_list_producers_cached_count(self):
+        """Test ?count=cached reuses the count of an identical filter set."""
+        cache.clear()
+        Producer.objects.create(name='Producer 1', cpf_cnpj='18.200.327/0001-72')
+        self.client.get(LIST_CREATE_PRODUCER_URL, {'count': 'cached'})
+        Producer.objects.create(name='Producer 2', cpf_cnpj='27.162.364/0001-24')
+
+        res = self.client.get(LIST_CREATE_PRODUCER_URL, {'count': 'cached'})
+        res_filtered = self.client.get(LIST_CREATE_PRODUCER_URL, {'count': 'cached', 'name': 'Producer 2'})
+
+        self.assertEqual(res.data['count_strategy'], 'cached')
+        self.assertEqual(res.data['count'], 1)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertEqual(res_filtered.data['count'], 1)
+
+    def test_list_producers_estimated_count(self):
+        """Test ?count=estimated reads planner statistics and counts small tables exactly."""
+        Producer.objects.create(name='Producer 1', cpf_cnpj='18.200.327/0001-72')
+
+        with self.settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=10 ** 9):
+            res = self.client.get(LIST_CREATE_PRODUCER_URL, {'count': 'estimated'})
+        with self.settings(PAGINATION_COUNT_ESTIMATE_THRESHOLD=0):
+            res_estimated = self.client.get(LIST_CREATE_PRODUCER_URL, {'count': 'estimated'})
+
+        self.assertEqual(res.data['count'], 1)
+        self.assertEqual(res.data['count_strategy'], 'exact')
+        self.assertEqual(res_estimated.data['count_strategy'], 'estimated')
+        self.assertIsInstance(res_estimated.data['count'], int)
+        self.assertEqual(len(res_estimated.data['results']), 1)
+
     def test_create_producer(self):
         """Test creating a new producer."""
         payload = {
@@ -77,6 +187,40 @@ class PrivateProducerApiTests(TestCase):
         producer = Producer.objects.get(id=res.data['id'])
         self.assertEqual(producer.name, payload['name'])
         self.assertEqual(producer.cpf_cnpj, payload['cpf_cnpj'])
+        self.assertEqual(producer.cpf_cnpj_digits, '79839483000172')
+
+    def test_create_producer_duplicate_document(self):
+        """Test a document is unique among active producers regardless of formatting."""
+        Producer.objects.create(name='Producer 1', cpf_cnpj='79.839.483/0001-72')
+
+        res = self.client.post(LIST_CREATE_PRODUCER_URL, {'name': 'Producer 2', 'cpf_cnpj': '79839483000172'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cpf_cnpj', res.data)
+        self.assertEqual(Producer.objects.count(), 1)
+
+    def test_create_producer_reuses_deleted_document(self):
+        """Test a soft-deleted producer's document can be registered again."""
+        Producer.objects.create(name='Producer 1', cpf_cnpj='79.839.483/0001-72', is_deleted=True)
+
+        res = self.client.post(LIST_CREATE_PRODUCER_URL, {'name': 'Producer 2', 'cpf_cnpj': '79839483000172'})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_update_producer_keeps_own_document(self):
+        """Test updating a producer with its own document in another format."""
+        producer = Producer.objects.create(name='Producer 1', cpf_cnpj='79.839.483/0001-72')
+
+        res = self.client.patch(detail_url(producer.id), {'cpf_cnpj': '79839483000172'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_database_rejects_duplicate_active_document(self):
+        """Test the unique index guards writes that bypass the serializer."""
+        Producer.objects.create(name='Producer 1', cpf_cnpj='79.839.483/0001-72')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Producer.objects.create(name='Producer 2', cpf_cnpj='79839483000172')
 
     def test_retrieve_producer(self):
         """Test retrieving a specific producer."""
@@ -110,9 +254,38 @@ class PrivateProducerApiTests(TestCase):
         res = self.client.delete(url)
 
         producer.refresh_from_db()
-        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertTrue(producer.is_deleted)
 
+    def test_delete_producer_cascades(self):
+        """Test deleting a producer soft deletes its farms, harvests and planted crops."""
+        producer = Producer.objects.create(name='Producer 1', cpf_cnpj='123.456.789-01')
+        other = Producer.objects.create(name='Producer 2', cpf_cnpj='123.456.789-02')
+        crop = Crop.objects.create(name='Soja')
+        for owner in (producer, other):
+            for index in range(3):
+                farm = Farm.objects.create(
+                    name=f'Farm {index}', city='City', state='SP', total_area=100, arable_area=70,
+                    vegetation_area=30, producer=owner,
+                )
+                harvest = Harvest.objects.create(year='2023', farm=farm)
+                PlantedCrop.objects.create(harvest=harvest, crop=crop)
+        Farm.objects.filter(producer=producer, name='Farm 0').update(is_deleted=True)
+
+        # Lookup, then one UPDATE per table inside a savepoint
+        with self.assertNumQueries(7):
+            res = self.client.delete(detail_url(producer.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['deleted'], {'producers': 1, 'farms': 2, 'harvests': 3, 'planted_crops': 3}
+        )
+        self.assertFalse(Farm.objects.filter(producer=producer).exists())
+        self.assertFalse(Harvest.objects.filter(farm__producer=producer).exists())
+        self.assertFalse(PlantedCrop.objects.filter(harvest__farm__producer=producer).exists())
+        self.assertEqual(PlantedCrop.objects.filter(harvest__farm__producer=other).count(), 3)
+        self.assertTrue(Crop.objects.filter(pk=crop.pk).exists())
+
     def test_list_producers_with_pagination(self):
         """Test listing producers with pagination."""
         Producer.objects.create(name='Producer 1', cpf_cnpj='123.456.789-01')
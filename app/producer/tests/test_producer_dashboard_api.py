@@ -1,37 +1,29 @@
-from django.test import TestCase
+import tempfile
+from unittest.mock import Mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.test import APIClient
-from user.models import Role
-from producer.models import Farm, Producer, PlantedCrop, Crop, Harvest
+from rest_framework.renderers import JSONRenderer
+from producer.tests import AdminApiTestCase, SharedCacheMixin
+from producer.aggregates import dashboard_data_orm, dashboard_data_sql, dashboard_slice, find_drift
+from producer.analytics import refresh_analytics
+from producer.bulk import set_harvest_crops
+from producer.cache import DashboardCache, dashboard_cache
+from producer.deletion import soft_delete
+from producer.models import Farm, Producer, PlantedCrop, Crop, Harvest, StateSummary, CropSummary
 
 DASHBOARD_URL = reverse('producer:dashboard-data')
 
 
-def create_user(**params):
-    """Create and return a new user."""
-    return get_user_model().objects.create_user(**params)
-
-
-class DashboardApiTests(TestCase):
+class DashboardApiTests(SharedCacheMixin, AdminApiTestCase):
     """Test the dashboard data API."""
 
-    fixtures = ['roles.json']
-
     def setUp(self):
-        role_admin = Role.objects.get(pk='bdb80a3e-7458-4548-95f7-1b84c7b79cda')
-        self.admin_user = create_user(
-            email='admin@example.com',
-            password='testpass123',
-            name='Admin User',
-            cpf='111.111.111-11',
-        )
-        self.admin_user.roles.add(role_admin)
-        self.admin_user.save()
-
-        self.client = APIClient()
-        self.client.force_authenticate(user=self.admin_user)
+        super().setUp()
+        dashboard_cache.clear()
 
         # Create a producer
         self.producer = Producer.objects.create(
@@ -104,3 +96,365 @@ class DashboardApiTests(TestCase):
         self.assertEqual(float(land_use['total_area']), 100.00)
         self.assertEqual(float(land_use['arable_area']), 70.00)
         self.assertEqual(float(land_use['vegetation_area']), 30.00)
+
+    def test_dashboard_reads_summaries(self):
+        """Test the dashboard is one query whatever the number of farms."""
+        for index in range(5):
+            Farm.objects.create(
+                name=f'Fazenda {index}', city='City', state='RJ', total_area=10, arable_area=5,
+                vegetation_area=5, producer=self.producer,
+            )
+
+        with self.assertNumQueries(1):
+            res = self.client.get(DASHBOARD_URL)
+
+        self.assertEqual(res.data['farms_by_state'], [{'state': 'RJ', 'count': 5}, {'state': 'SP', 'count': 1}])
+        self.assertEqual(float(res.data['land_use']['total_area']), 150.00)
+
+    def test_identical_requests_served_from_cache(self):
+        """Test a repeated request reads nothing from the database."""
+        self.client.get(DASHBOARD_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(DASHBOARD_URL)
+
+        self.assertEqual(res.data['farms_by_state'], [{'state': 'SP', 'count': 1}])
+        self.assertEqual((dashboard_cache.stats()['hits'], dashboard_cache.stats()['misses']), (1, 1))
+
+    def test_not_modified_with_matching_etag(self):
+        """Test a client holding the current ETag gets 304 without a body."""
+        etag = self.client.get(DASHBOARD_URL)['ETag']
+
+        res = self.client.get(DASHBOARD_URL, HTTP_IF_NONE_MATCH=f'W/{etag}')
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertFalse(res.content)
+        self.assertEqual(dashboard_cache.stats()['not_modified'], 1)
+
+    def test_write_through_api_invalidates(self):
+        """Test a committed write stamps a new version, and a rejected one does not."""
+        etag = self.client.get(DASHBOARD_URL)['ETag']
+        payload = {
+            'name': 'Fazenda 3', 'city': 'City 3', 'state': 'GO', 'total_area': 50.0, 'arable_area': 40.0,
+            'vegetation_area': 30.0, 'producer': str(self.producer.id),
+        }
+        version = dashboard_cache.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(reverse('producer:list_create_farm'), payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(dashboard_cache.version(), version)
+
+        payload['vegetation_area'] = 10.0
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('producer:list_create_farm'), payload, format='json')
+        res = self.client.get(DASHBOARD_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.data['farms_by_state'][0], {'state': 'GO', 'count': 1})
+
+    def test_metrics_expose_dashboard_cache(self):
+        """Test the metrics report the hit ratio and recompute time."""
+        self.client.get(DASHBOARD_URL)
+        self.client.get(DASHBOARD_URL)
+
+        stats = self.client.get(reverse('metrics')).data['dashboard_cache']
+
+        self.assertEqual(stats['hit_ratio'], 0.5)
+        self.assertGreater(stats['recompute_seconds_total'], 0)
+
+
+class DashboardCacheTests(SimpleTestCase):
+    """Test the dashboard cache as seen by two workers, each with its own cache instance."""
+
+    def workers(self):
+        return DashboardCache('worker_1', 60), DashboardCache('worker_2', 60)
+
+    def test_bump_reaches_every_worker(self):
+        """Test a version stamped by one worker invalidates the entries read by the other."""
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={'default': backend, 'worker_1': backend, 'worker_2': backend}):
+                first, second = self.workers()
+                compute = Mock(return_value={'total_farms': 1})
+
+                first.get_or_compute({}, compute)
+                second.get_or_compute({}, compute)
+                self.assertEqual(compute.call_count, 1)
+
+                first.bump()
+                second.get_or_compute({}, compute)
+                self.assertEqual(compute.call_count, 2)
+
+    def test_process_local_backend_is_not_cached(self):
+        """Test nothing is cached when a worker's bump could not reach the others."""
+        backend = 'django.core.cache.backends.locmem.LocMemCache'
+        with override_settings(CACHES={
+            'default': {'BACKEND': backend},
+            'worker_1': {'BACKEND': backend, 'LOCATION': 'worker_1'},
+            'worker_2': {'BACKEND': backend, 'LOCATION': 'worker_2'},
+        }):
+            first, second = self.workers()
+            compute = Mock(return_value={'total_farms': 1})
+
+            etag, _ = first.get_or_compute({}, compute)
+            first.get_or_compute({}, compute)
+            second.get_or_compute({}, compute)
+
+            self.assertEqual(compute.call_count, 3)
+            self.assertEqual(second.get_or_compute({}, compute)[0], etag)
+            self.assertFalse(first.stats()['shared'])
+
+
+class DashboardSummaryTests(TestCase):
+    """Test the summary tables follow every write path of farms and planted crops."""
+
+    def setUp(self):
+        self.producer = Producer.objects.create(name='Producer 1', cpf_cnpj='18.200.327/0001-72')
+        self.crop = Crop.objects.create(name='Soja')
+
+    def create_farm(self, state='SP', **params):
+        return Farm.objects.create(
+            name='Fazenda', city='City', state=state, total_area=100, arable_area=70, vegetation_area=30,
+            producer=self.producer, **params,
+        )
+
+    def state_rows(self):
+        return {
+            row.state: (row.farm_count, float(row.total_area))
+            for row in StateSummary.objects.exclude(farm_count=0)
+        }
+
+    def tearDown(self):
+        self.assertEqual(find_drift(), [])
+
+    def test_farm_updates_move_between_states(self):
+        """Test saving a farm in another state or with new areas moves its totals."""
+        farm = self.create_farm()
+        self.create_farm(is_deleted=True)
+
+        farm.state = 'MG'
+        farm.total_area = 120
+        farm.save()
+
+        self.assertEqual(self.state_rows(), {'MG': (1, 120.0)})
+
+    def test_set_based_writes(self):
+        """Test bulk inserts and queryset updates adjust the totals once per statement."""
+        Farm.objects.bulk_create([Farm(
+            name='Fazenda', city='City', state=state, total_area=100, arable_area=70, vegetation_area=30,
+            producer=self.producer,
+        ) for state in ('SP', 'SP', 'MG')])
+
+        Farm.objects.filter(state='SP').update(total_area=50)
+
+        self.assertEqual(self.state_rows(), {'SP': (2, 100.0), 'MG': (1, 100.0)})
+
+    def test_cascading_soft_delete(self):
+        """Test soft deleting a producer removes its farms and planted crops from the totals."""
+        harvest = Harvest.objects.create(year='2023', farm=self.create_farm())
+        set_harvest_crops(harvest, [self.crop.id])
+        self.assertEqual(CropSummary.objects.get(crop=self.crop).planted_count, 1)
+
+        soft_delete(self.producer)
+
+        self.assertEqual(self.state_rows(), {})
+        self.assertEqual(CropSummary.objects.get(crop=self.crop).planted_count, 0)
+
+    def test_hard_delete(self):
+        """Test deleting rows outright also removes them from the totals."""
+        harvest = Harvest.objects.create(year='2023', farm=self.create_farm())
+        PlantedCrop.objects.create(harvest=harvest, crop=self.crop)
+
+        self.producer.delete()
+
+        self.assertEqual(self.state_rows(), {})
+        self.assertEqual(CropSummary.objects.get(crop=self.crop).planted_count, 0)
+
+
+class DashboardQueryTests(TestCase):
+    """Test the single statement over the summary tables matches an aggregation of the base tables."""
+
+    def assertSamePayload(self):
+        renderer = JSONRenderer()
+        with self.assertNumQueries(1):
+            sql = dashboard_data_sql()
+        self.assertEqual(renderer.render(sql), renderer.render(dashboard_data_orm()))
+        return sql
+
+    def test_empty(self):
+        self.assertEqual(
+            self.assertSamePayload(),
+            {
+                'farms_by_state': [], 'crops_distribution': [],
+                'land_use': {'total_area': None, 'arable_area': None, 'vegetation_area': None},
+            },
+        )
+
+    def test_states_crops_and_land_use(self):
+        producer = Producer.objects.create(name='Producer 1', cpf_cnpj='18.200.327/0001-72')
+        crops = [Crop.objects.create(name=name) for name in ('Soja', 'Milho', 'Soja', 'Café')]
+        for index, state in enumerate(['SP', 'MG', 'SP', 'BA', 'MG', 'SP']):
+            farm = Farm.objects.create(
+                name=f'Fazenda {index}', city='City', state=state, total_area=100.25, arable_area=60.5,
+                vegetation_area=index, producer=producer, is_deleted=index == 5,
+            )
+            harvest = Harvest.objects.create(year='2023', farm=farm)
+            set_harvest_crops(harvest, [crop.id for crop in crops[:index % 4 + 1]])
+
+        payload = self.assertSamePayload()
+
+        self.assertEqual(
+            payload['farms_by_state'],
+            [{'state': 'MG', 'count': 2}, {'state': 'SP', 'count': 2}, {'state': 'BA', 'count': 1}],
+        )
+        self.assertEqual(payload['crops_distribution'][0], {'crop': 'Soja', 'count': 8})
+        self.assertEqual(str(payload['land_use']['total_area']), '501.25')
+
+
+class SliceDataMixin:
+    """Farms in two states, two producers and two harvest years."""
+
+    def setUp(self):
+        super().setUp()
+        dashboard_cache.clear()
+
+        self.producer_1 = Producer.objects.create(name='Producer 1', cpf_cnpj='18.200.327/0001-72')
+        self.producer_2 = Producer.objects.create(name='Producer 2', cpf_cnpj='123.456.789-01')
+        soja, milho = Crop.objects.create(name='Soja'), Crop.objects.create(name='Milho')
+        for producer, state, year, crops in [
+            (self.producer_1, 'MG', '2024', [soja, milho]),
+            (self.producer_1, 'SP', '2023', [soja]),
+            (self.producer_2, 'MG', '2023', [milho]),
+        ]:
+            farm = Farm.objects.create(
+                name='Fazenda', city='City', state=state, total_area=100, arable_area=60, vegetation_area=40,
+                producer=producer,
+            )
+            harvest = Harvest.objects.create(year=year, farm=farm)
+            set_harvest_crops(harvest, [crop.id for crop in crops])
+
+
+class DashboardSliceApiTests(SharedCacheMixin, SliceDataMixin, AdminApiTestCase):
+    """Test the dashboard sliced by state, producer and harvest year."""
+
+    def test_slice_by_state_and_year(self):
+        res = self.client.get(DASHBOARD_URL, {'state': 'mg', 'year': '2024'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['farms_by_state'], [{'state': 'MG', 'count': 1}])
+        self.assertEqual(
+            res.data['crops_distribution'], [{'crop': 'Milho', 'count': 1}, {'crop': 'Soja', 'count': 1}]
+        )
+        self.assertEqual(float(res.data['land_use']['total_area']), 100.0)
+
+    def test_slice_by_producer(self):
+        res = self.client.get(DASHBOARD_URL, {'producer': self.producer_1.id})
+
+        self.assertEqual(res.data['farms_by_state'], [{'state': 'MG', 'count': 1}, {'state': 'SP', 'count': 1}])
+        self.assertEqual(
+            res.data['crops_distribution'], [{'crop': 'Soja', 'count': 2}, {'crop': 'Milho', 'count': 1}]
+        )
+        self.assertEqual(float(res.data['land_use']['arable_area']), 120.0)
+
+    def test_slice_by_year(self):
+        res = self.client.get(DASHBOARD_URL, {'year': '2023'})
+
+        self.assertEqual(res.data['farms_by_state'], [{'state': 'MG', 'count': 1}, {'state': 'SP', 'count': 1}])
+        self.assertEqual(
+            res.data['crops_distribution'], [{'crop': 'Milho', 'count': 1}, {'crop': 'Soja', 'count': 1}]
+        )
+
+    def test_empty_slice(self):
+        res = self.client.get(DASHBOARD_URL, {'state': 'RS'})
+
+        self.assertEqual(
+            res.data,
+            {
+                'farms_by_state': [], 'crops_distribution': [],
+                'land_use': {'total_area': None, 'arable_area': None, 'vegetation_area': None},
+            },
+        )
+
+    def test_unfiltered_slice_matches_global(self):
+        """Test the slice path over every farm renders the same payload as the summary path."""
+        renderer = JSONRenderer()
+
+        self.assertEqual(renderer.render(dashboard_slice()), renderer.render(dashboard_data_sql()))
+
+    def test_invalid_producer(self):
+        res = self.client.get(DASHBOARD_URL, {'producer': 'not-a-uuid'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_slices_cached_separately(self):
+        """Test each slice has its own entry and equivalent queries share it."""
+        mg = self.client.get(DASHBOARD_URL, {'state': 'MG'})
+        sp = self.client.get(DASHBOARD_URL, {'state': 'SP'})
+        again = self.client.get(DASHBOARD_URL, {'state': 'mg', 'ignored': '1'})
+
+        self.assertNotEqual(mg['ETag'], sp['ETag'])
+        self.assertEqual(again['ETag'], mg['ETag'])
+        self.assertEqual((dashboard_cache.stats()['hits'], dashboard_cache.stats()['misses']), (1, 2))
+
+
+class DashboardStaleApiTests(SharedCacheMixin, SliceDataMixin, AdminApiTestCase):
+    """Test the dashboard read from the materialized analytics views."""
+
+    def test_stale_until_refresh(self):
+        """Test the stale mode shows the data as of the last refresh."""
+        refresh_analytics()
+        Farm.objects.create(
+            name='Fazenda', city='City', state='RS', total_area=10, arable_area=5, vegetation_area=5,
+            producer=self.producer_1,
+        )
+        before = self.client.get(DASHBOARD_URL, {'freshness': 'stale'})
+
+        refresh_analytics()
+        after = self.client.get(DASHBOARD_URL, {'freshness': 'stale'})
+
+        self.assertNotIn({'state': 'RS', 'count': 1}, before.data['farms_by_state'])
+        self.assertIn({'state': 'RS', 'count': 1}, after.data['farms_by_state'])
+
+    def test_refresh_and_writes_invalidate_separately(self):
+        """Test a refresh keeps cached fresh responses and a write keeps cached stale ones."""
+        refresh_analytics()
+        self.client.get(DASHBOARD_URL)
+        refresh_analytics()
+        self.client.get(DASHBOARD_URL)
+
+        self.client.get(DASHBOARD_URL, {'freshness': 'stale'})
+        dashboard_cache.bump()
+        self.client.get(DASHBOARD_URL, {'freshness': 'stale'})
+
+        self.assertEqual((dashboard_cache.stats()['hits'], dashboard_cache.stats()['misses']), (2, 2))
+
+    def test_stale_matches_fresh(self):
+        """Test every slice of the refreshed views renders the same payload as the live data."""
+        refresh_analytics()
+        renderer = JSONRenderer()
+        for params in [
+            {}, {'state': 'MG'}, {'year': '2023'}, {'producer': self.producer_1.id},
+            {'state': 'MG', 'year': '2024', 'producer': self.producer_1.id}, {'state': 'RS'},
+        ]:
+            fresh = self.client.get(DASHBOARD_URL, params)
+            stale = self.client.get(DASHBOARD_URL, {**params, 'freshness': 'stale'})
+
+            self.assertEqual(renderer.render(stale.data), renderer.render(fresh.data), params)
+
+    def test_stale_reads_a_single_row_per_state_and_crop(self):
+        """Test the stale mode reads pre-aggregated rows through the unique indexes."""
+        refresh_analytics()
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(DASHBOARD_URL, {'freshness': 'stale', 'year': '2023'})
+
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertIn('FROM analytics_farms', context.captured_queries[0]['sql'])
+        self.assertIn('FROM analytics_crops', context.captured_queries[1]['sql'])
+
+    def test_invalid_freshness(self):
+        res = self.client.get(DASHBOARD_URL, {'freshness': 'soon'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,239 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from producer.cache import dashboard_cache
+from producer.deletion import soft_delete
+from producer.models import Crop, Farm, Harvest, Producer
+from producer.tests import AdminApiTestCase
+
+PRODUCERS = 50
+FARMS_PER_PRODUCER = 40
+HARVESTS_PER_FARM = 3
+CROPS = 20
+# Children of the producer and farm the filters probe, so a sort would be costly
+FAN_OUT = 500
+# Producers and crops stay small enough for a sequential scan to be the right plan
+LARGE_TABLES = {'farms', 'harvests', 'planted_crops'}
+# Planner settings turned off to check that a plan made only of index lookups exists
+LOOKUP_ONLY_SETTINGS = ['enable_seqscan', 'enable_hashjoin', 'enable_mergejoin']
+STATES = [
+    'AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS', 'MG', 'PA',
+    'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO',
+]
+
+
+def seed():
+    """Seed 2.5k farms, 8k harvests and 16k planted crops, a tenth of the farms soft deleted."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            '''
+            INSERT INTO producers (id, created_at, updated_at, is_active, is_deleted, name, cpf_cnpj, cpf_cnpj_digits)
+            SELECT gen_random_uuid(), now(), now(), true, false, 'Producer ' || i, lpad(i::text, 11, '0'),
+                   lpad(i::text, 11, '0')
+            FROM generate_series(1, %s) AS i
+            ''',
+            [PRODUCERS],
+        )
+        cursor.execute(
+            '''
+            INSERT INTO crops (id, created_at, updated_at, is_active, is_deleted, name)
+            SELECT gen_random_uuid(), now(), now(), true, false, 'Crop ' || i
+            FROM generate_series(0, %s - 1) AS i
+            ''',
+            [CROPS],
+        )
+        cursor.execute(
+            '''
+            INSERT INTO farms (
+                id, created_at, updated_at, is_active, is_deleted, name, city, state,
+                total_area, arable_area, vegetation_area, producer_id
+            )
+            SELECT gen_random_uuid(), now(), now(), true, i %% 10 = 0, md5(p.id::text || i), 'City',
+                   (%s::text[])[abs(hashtext(p.name || i)) %% %s + 1], 100, 70, 30, p.id
+            FROM producers p CROSS JOIN generate_series(1, %s) AS i
+            ''',
+            [STATES, len(STATES), FARMS_PER_PRODUCER],
+        )
+        cursor.execute(
+            '''
+            INSERT INTO farms (
+                id, created_at, updated_at, is_active, is_deleted, name, city, state,
+                total_area, arable_area, vegetation_area, producer_id
+            )
+            SELECT gen_random_uuid(), now(), now(), true, false, md5(i::text), 'City', 'SP',
+                   100, 70, 30, (SELECT id FROM producers WHERE name = 'Producer 1')
+            FROM generate_series(1, %s) AS i
+            ''',
+            [FAN_OUT],
+        )
+        cursor.execute(
+            '''
+            INSERT INTO harvests (id, created_at, updated_at, is_active, is_deleted, year, farm_id)
+            SELECT gen_random_uuid(), now(), now(), true, false, (2000 + i)::text, f.id
+            FROM farms f CROSS JOIN generate_series(1, %s) AS i
+            ''',
+            [HARVESTS_PER_FARM],
+        )
+        cursor.execute(
+            '''
+            INSERT INTO harvests (id, created_at, updated_at, is_active, is_deleted, year, farm_id)
+            SELECT gen_random_uuid(), now(), now(), true, false, (1000 + i)::text,
+                   (SELECT id FROM farms WHERE NOT is_deleted ORDER BY name LIMIT 1)
+            FROM generate_series(1, %s) AS i
+            ''',
+            [FAN_OUT],
+        )
+        cursor.execute(
+            '''
+            INSERT INTO planted_crops (id, created_at, updated_at, is_active, is_deleted, harvest_id, crop_id)
+            SELECT gen_random_uuid(), now(), now(), true, false, h.id, c.id
+            FROM harvests h JOIN crops c
+              ON c.name IN (
+                  'Crop ' || abs(hashtext(h.id::text)) %% %s,
+                  'Crop ' || (abs(hashtext(h.id::text)) + 1) %% %s
+              )
+            ''',
+            [CROPS, CROPS],
+        )
+        cursor.execute('ANALYZE producers, crops, farms, harvests, planted_crops')
+
+
+def walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk(child)
+
+
+class ListQueryPlanTests(AdminApiTestCase):
+    """Guard the list endpoints against plans that sort or scan whole tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed()
+        cls.farm = Farm.objects.order_by('name').first()
+        cls.producer = Producer.objects.get(name='Producer 1')
+        cls.harvest = Harvest.objects.order_by('-year').first()
+        cls.crop = Crop.objects.order_by('name').first()
+
+    def setUp(self):
+        super().setUp()
+
+    def plan(self, sql, lookups_only=False):
+        with connection.cursor() as cursor:
+            for setting in LOOKUP_ONLY_SETTINGS if lookups_only else []:
+                cursor.execute(f'SET LOCAL {setting} = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+            for setting in LOOKUP_ONLY_SETTINGS if lookups_only else []:
+                cursor.execute(f'RESET {setting}')
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    def explain(self, sql):
+        return [
+            (node['Node Type'], node.get('Relation Name'), node.get('Index Name'))
+            for node in walk(self.plan(sql))
+        ]
+
+    def get_plan(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url, {'count': 'none', **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['results'])
+        (query,) = context.captured_queries
+        return self.explain(query['sql'])
+
+    def assertOrderedIndexPlan(self, url, params, index):
+        """Assert the page is read in order from `index`, without sorting or scanning the large tables."""
+        nodes = self.get_plan(url, params)
+
+        self.assertFalse([node for node in nodes if node[0] == 'Seq Scan' and node[1] in LARGE_TABLES], nodes)
+        self.assertFalse([node for node in nodes if 'Sort' in node[0]], nodes)
+        self.assertIn(index, [node[2] for node in nodes], nodes)
+
+    def test_farms_by_producer_ordered_by_name(self):
+        self.assertOrderedIndexPlan(
+            reverse('producer:list_create_farm'), {'producer': self.producer.id}, 'farms_active_producer'
+        )
+
+    def test_farms_ordered_by_name(self):
+        self.assertOrderedIndexPlan(reverse('producer:list_create_farm'), {}, 'farms_active_name')
+
+    def test_harvests_by_farm_ordered_by_year(self):
+        self.assertOrderedIndexPlan(
+            reverse('producer:list_create_harvest'), {'farm': self.farm.id}, 'harvests_active_farm'
+        )
+
+    def test_planted_crops_by_harvest(self):
+        self.assertOrderedIndexPlan(
+            reverse('producer:list_create_planted_crop'), {'harvest': self.harvest.id}, 'planted_crops_active_harvest'
+        )
+
+    def test_planted_crops_by_crop_ordered_by_harvest(self):
+        self.assertOrderedIndexPlan(
+            reverse('producer:list_create_planted_crop'), {'crop': self.crop.id}, 'planted_crops_active_crop'
+        )
+
+    def test_farms_by_producer_cursor_page(self):
+        url = reverse('producer:list_create_farm')
+        res = self.client.get(url, {'producer': self.producer.id, 'pagination': 'cursor'})
+
+        self.assertOrderedIndexPlan(
+            url, {'producer': self.producer.id, 'cursor': res.data['next']}, 'farms_active_producer'
+        )
+
+    def assertIndexLookups(self, sql):
+        """Assert `sql` can reach the large tables through index lookups alone."""
+        scans = [
+            (node['Node Type'], node.get('Relation Name'), node.get('Index Name'), node.get('Index Cond'))
+            for node in walk(self.plan(sql, lookups_only=True)) if 'Scan' in node['Node Type']
+        ]
+        self.assertFalse([scan for scan in scans if scan[0] == 'Seq Scan' and scan[1] in LARGE_TABLES], scans)
+        # A full pass over an index is no better than a sequential scan
+        self.assertFalse(
+            [scan for scan in scans if scan[2] and scan[2].startswith(tuple(LARGE_TABLES)) and not scan[3]],
+            scans,
+        )
+
+    def test_soft_delete_cascade_reads_children_through_indexes(self):
+        """Test every level of a producer's soft delete reaches its rows through an index."""
+        with CaptureQueriesContext(connection) as context:
+            soft_delete(self.producer)
+
+        updates = [query['sql'] for query in context.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 4)
+        for sql in updates:
+            self.assertIndexLookups(sql)
+
+    def assertIndexedDashboardSlice(self, params):
+        """
+        Assert every query of a dashboard slice can reach the large tables through indexes.
+
+        The seeded tables are small enough for the planner to rightly prefer
+        sequential scans and hash joins for the wider slices, so both are
+        disabled here: a scan left without an index condition means no index
+        serves that step of the slice.
+        """
+        dashboard_cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(reverse('producer:dashboard-data'), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['farms_by_state'])
+        for query in context.captured_queries:
+            self.assertIndexLookups(query['sql'])
+
+    def test_dashboard_by_state(self):
+        self.assertIndexedDashboardSlice({'state': 'MG'})
+
+    def test_dashboard_by_state_and_year(self):
+        self.assertIndexedDashboardSlice({'state': 'MG', 'year': '2001'})
+
+    def test_dashboard_by_producer(self):
+        self.assertIndexedDashboardSlice({'producer': Producer.objects.get(name='Producer 2').id})
+
+    def test_dashboard_by_year(self):
+        self.assertIndexedDashboardSlice({'year': '1001'})
@@ -10,13 +10,16 @@ app_name = 'producer'
 
 urlpatterns = [
     path('', views.ProducerManagementView.as_view(), name='list_create_producer'),
+    path('bulk/', views.ProducerBulkCreateView.as_view(), name='bulk_create_producer'),
     path('<uuid:id>/', views.ProducerRetrieveUpdateView.as_view(), name='update_retrieve_producer'),
     path('farm/', views.FarmManagementView.as_view(), name='list_create_farm'),
+    path('farm/bulk/', views.FarmBulkUpsertView.as_view(), name='bulk_upsert_farm'),
     path('farm/<uuid:id>/', views.FarmRetrieveUpdateView.as_view(), name='update_retrieve_farm'),
     path('crops/', views.CropManagementView.as_view(), name='list_create_crop'),
     path('crops/<uuid:id>/', views.CropRetrieveUpdateView.as_view(), name='update_retrieve_crop'),
     path('harvests/', views.HarvestManagementView.as_view(), name='list_create_harvest'),
     path('harvests/<uuid:id>/', views.HarvestRetrieveUpdateView.as_view(), name='update_retrieve_harvest'),
+    path('harvests/<uuid:id>/crops/', views.HarvestCropsView.as_view(), name='harvest_crops'),
     path('planted-crops/', views.PlantedCropManagementView.as_view(), name='list_create_planted_crop'),
     path(
         'planted-crops/<uuid:id>/',
@@ -1,13 +1,25 @@
-from rest_framework import generics, permissions, filters
+from django.conf import settings
+from django.db import transaction
+from django.utils.http import parse_etags
+from django.utils.translation import gettext_lazy as _
+from rest_framework import generics, permissions, filters, status
 from user.auth import (
     CheckTokenAuthentication,
 )
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Sum
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from producer.aggregates import dashboard_data
+from producer.analytics import dashboard_data_stale
+from producer.cache import dashboard_cache
+from producer.deletion import soft_delete
+from producer.bulk import CREATED, FAILED, UPDATED, bulk_create_producers, bulk_upsert_farms, set_harvest_crops
 from producer.serializers import (
     ProducerSerializer,
+    ProducerBulkItemSerializer,
+    FarmBulkItemSerializer,
+    HarvestCropsSerializer,
+    DashboardFilterSerializer,
     FarmSerializer,
     CropSerializer,
     HarvestSerializer,
@@ -19,7 +31,16 @@ from user.permissions import IsSuperAdmin, IsAdmin
 from utils.pagination import CustomPagination
 
 
-class ProducerManagementView(generics.ListCreateAPIView):
+class DashboardVersionMixin:
+    """Stamp a new dashboard data version once a write through this view commits."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in permissions.SAFE_METHODS and response.status_code < status.HTTP_400_BAD_REQUEST:
+            transaction.on_commit(dashboard_cache.bump)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ProducerManagementView(DashboardVersionMixin, generics.ListCreateAPIView):
     """Manage users in the system. Allows listing, creating, and updating users."""
     serializer_class = ProducerSerializer
     authentication_classes = [CheckTokenAuthentication]
@@ -32,29 +53,74 @@ class ProducerManagementView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """Return the queryset excluding the logged-in user."""
-        return Producer.objects.exclude(
-            is_deleted=True
+        return Producer.objects.all()
+
+
+class BulkWriteMixin:
+    """
+    Validate a JSON array body and answer with one result per item.
+
+    `bulk_writer` takes the items and returns their results, one per item.
+    """
+    bulk_writer = None
+
+    def post(self, request, *args, **kwargs):
+        assert self.bulk_writer is not None, (
+            f"'{self.__class__.__name__}' should include a `bulk_writer` attribute."
         )
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'detail': _('Expected a list of items.')}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BULK_MAX_ITEMS:
+            return Response(
+                {'detail': _('At most %(max)d items per request.') % {'max': settings.BULK_MAX_ITEMS}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        with transaction.atomic():
+            results = self.bulk_writer(items)
+        counts = {key: 0 for key in (CREATED, UPDATED, FAILED)}
+        for result in results:
+            counts[result['status']] += 1
+        if not counts[FAILED]:
+            response_status = status.HTTP_201_CREATED if counts[CREATED] else status.HTTP_200_OK
+        elif counts[FAILED] == len(results):
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({**counts, 'results': results}, status=response_status)
+
+
+class CascadeSoftDeleteMixin:
+    """Soft delete the object and the rows under it, answering with the deleted counts."""
+
+    def destroy(self, request, *args, **kwargs):
+        return Response({'deleted': soft_delete(self.get_object())})
+
+
+class ProducerBulkCreateView(DashboardVersionMixin, BulkWriteMixin, generics.GenericAPIView):
+    """Create many producers in one request."""
+    serializer_class = ProducerBulkItemSerializer
+    authentication_classes = [CheckTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
+    bulk_writer = staticmethod(bulk_create_producers)
 
 
-class ProducerRetrieveUpdateView(generics.RetrieveUpdateDestroyAPIView):
+class ProducerRetrieveUpdateView(
+    DashboardVersionMixin, CascadeSoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """Manage retrieving and updating users in the system."""
     serializer_class = ProducerSerializer
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
-    queryset = Producer.objects.exclude(is_deleted=True)
+    queryset = Producer.objects.all()
     lookup_field = 'id'
 
     def get_queryset(self):
         queryset = super().get_queryset()
         return queryset
 
-    def perform_destroy(self, instance):
-        instance.is_deleted = True
-        instance.save()
-
 
-class FarmManagementView(generics.ListCreateAPIView):
+class FarmManagementView(DashboardVersionMixin, generics.ListCreateAPIView):
     """Manage farms in the system. Allows listing and creating farms."""
     serializer_class = FarmSerializer
     authentication_classes = [CheckTokenAuthentication]
@@ -66,23 +132,29 @@ class FarmManagementView(generics.ListCreateAPIView):
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        return Farm.objects.exclude(is_deleted=True)
+        return Farm.objects.select_related('producer')
+
+
+class FarmBulkUpsertView(DashboardVersionMixin, BulkWriteMixin, generics.GenericAPIView):
+    """Create farms without an id and update the farms whose id is given."""
+    serializer_class = FarmBulkItemSerializer
+    authentication_classes = [CheckTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
+    bulk_writer = staticmethod(bulk_upsert_farms)
 
 
-class FarmRetrieveUpdateView(generics.RetrieveUpdateDestroyAPIView):
+class FarmRetrieveUpdateView(
+    DashboardVersionMixin, CascadeSoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """Manage retrieving, updating, and deleting farms."""
     serializer_class = FarmSerializer
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
-    queryset = Farm.objects.exclude(is_deleted=True)
+    queryset = Farm.objects.select_related('producer')
     lookup_field = 'id'
 
-    def perform_destroy(self, instance):
-        instance.is_deleted = True
-        instance.save()
-
 
-class CropManagementView(generics.ListCreateAPIView):
+class CropManagementView(DashboardVersionMixin, generics.ListCreateAPIView):
     serializer_class = CropSerializer
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
@@ -93,22 +165,20 @@ class CropManagementView(generics.ListCreateAPIView):
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        return Crop.objects.exclude(is_deleted=True)
+        return Crop.objects.all()
 
 
-class CropRetrieveUpdateView(generics.RetrieveUpdateDestroyAPIView):
+class CropRetrieveUpdateView(
+    DashboardVersionMixin, CascadeSoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = CropSerializer
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
-    queryset = Crop.objects.exclude(is_deleted=True)
+    queryset = Crop.objects.all()
     lookup_field = 'id'
 
-    def perform_destroy(self, instance):
-        instance.is_deleted = True
-        instance.save()
 
-
-class HarvestManagementView(generics.ListCreateAPIView):
+class HarvestManagementView(DashboardVersionMixin, generics.ListCreateAPIView):
     serializer_class = HarvestSerializer
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
@@ -119,22 +189,38 @@ class HarvestManagementView(generics.ListCreateAPIView):
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        return Harvest.objects.exclude(is_deleted=True)
+        return Harvest.objects.select_related('farm')
 
 
-class HarvestRetrieveUpdateView(generics.RetrieveUpdateDestroyAPIView):
+class HarvestRetrieveUpdateView(
+    DashboardVersionMixin, CascadeSoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = HarvestSerializer
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
-    queryset = Harvest.objects.exclude(is_deleted=True)
+    queryset = Harvest.objects.select_related('farm')
     lookup_field = 'id'
 
-    def perform_destroy(self, instance):
-        instance.is_deleted = True
-        instance.save()
 
+class HarvestCropsView(DashboardVersionMixin, generics.GenericAPIView):
+    """Replace the crops planted in a harvest with the given list."""
+    serializer_class = HarvestCropsSerializer
+    authentication_classes = [CheckTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
+    queryset = Harvest.objects.select_for_update()
+    lookup_field = 'id'
+
+    def put(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        crop_ids = serializer.validated_data['crops']
+        with transaction.atomic():
+            harvest = self.get_object()
+            added, removed = set_harvest_crops(harvest, crop_ids)
+        return Response({'harvest': harvest.id, 'crops': crop_ids, 'added': added, 'removed': removed})
 
-class PlantedCropManagementView(generics.ListCreateAPIView):
+
+class PlantedCropManagementView(DashboardVersionMixin, generics.ListCreateAPIView):
     serializer_class = PlantedCropSerializer
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
@@ -145,49 +231,38 @@ class PlantedCropManagementView(generics.ListCreateAPIView):
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        return PlantedCrop.objects.exclude(is_deleted=True)
+        return PlantedCrop.objects.select_related('crop', 'harvest__farm')
 
 
-class PlantedCropRetrieveUpdateView(generics.RetrieveUpdateDestroyAPIView):
+class PlantedCropRetrieveUpdateView(
+    DashboardVersionMixin, CascadeSoftDeleteMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = PlantedCropSerializer
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
-    queryset = PlantedCrop.objects.exclude(is_deleted=True)
+    queryset = PlantedCrop.objects.select_related('crop', 'harvest__farm')
     lookup_field = 'id'
 
-    def perform_destroy(self, instance):
-        instance.is_deleted = True
-        instance.save()
-
 
 class DashboardView(APIView):
+    """
+    Farms by state, crops distribution and land use, optionally sliced by
+    state, producer and year. ?freshness=stale reads the analytics views,
+    which lag writes until their next refresh.
+    """
     authentication_classes = [CheckTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated, (IsAdmin | IsSuperAdmin)]
 
     def get(self, request, *args, **kwargs):
-        farms_by_state = (
-            Farm.objects.filter(is_deleted=False)
-            .values('state')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
-        farm_state_data = [{'state': item['state'], 'count': item['count']} for item in farms_by_state]
-        crops_distribution = (
-            PlantedCrop.objects.filter(is_deleted=False)
-            .values('crop__name')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
-        crop_data = [{'crop': item['crop__name'], 'count': item['count']} for item in crops_distribution]
-        land_use = Farm.objects.filter(is_deleted=False).aggregate(
-            total_area=Sum('total_area'),
-            arable_area=Sum('arable_area'),
-            vegetation_area=Sum('vegetation_area')
-        )
-        data = {
-            'farms_by_state': farm_state_data,
-            'crops_distribution': crop_data,
-            'land_use': land_use
-        }
-
-        return Response(data)
+        """Serve the data of the current version from the cache, or 304 if the client holds it."""
+        serializer = DashboardFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data)
+        stale = filters.pop('freshness') == serializer.STALE
+        compute = dashboard_data_stale if stale else dashboard_data
+        etag, data = dashboard_cache.get_or_compute(serializer.validated_data, lambda: compute(**filters), stale)
+        held = [tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))]
+        if etag in held or '*' in held:
+            dashboard_cache.count_not_modified()
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(data, headers={'ETag': etag})
@@ -1,5 +1,14 @@
-from .token import CheckTokenAuthentication
+from .token import CheckTokenAuthentication, refresh_token
+from .cache import auth_cache
+from .signed import (
+    issue_signed_token,
+    revoke_signed_tokens,
+)
 
 __all__ = [
     "CheckTokenAuthentication",
+    "refresh_token",
+    "auth_cache",
+    "issue_signed_token",
+    "revoke_signed_tokens",
 ]
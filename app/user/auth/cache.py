@@ -0,0 +1,133 @@
+"""
+Shared cache of resolved auth tokens, users and role sets.
+
+Entries live in a Django cache backend so every worker sees the same data.
+User entries are stamped with a per-user version; bumping the version on a
+write makes every worker discard the stale entries on their next read.
+"""
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from utils import metrics
+
+
+class AuthCache:
+    """Version-stamped cache for (user, token, created) entries and role sets.
+
+    Role sets are the memoized ``User.role_names`` stored with each user.
+    """
+
+    def __init__(self, alias, ttl):
+        self.alias = alias
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        """Return the cached (user, token) pair for a token key or None."""
+        entry = self.cache.get(self._token_key(key))
+        user = None
+        if entry is not None:
+            version_key = self._version_key(entry['user_id'])
+            user_key = self._user_key(entry['user_id'], entry['version'])
+            values = self.cache.get_many([version_key, user_key])
+            if values.get(version_key) == entry['version']:
+                user = values.get(user_key)
+
+        self._count(user is not None)
+        if user is None:
+            return None
+        token = entry['token']
+        token.user = user
+        return user, token
+
+    def set(self, key, user, token):
+        """Cache the resolved user and token for the given key."""
+        version = self._current_version(user.pk)
+        # Resolve the memoized role names so they are stored with the user.
+        user.role_names
+        token = token.__class__(key=token.key, user_id=token.user_id, created=token.created)
+        self.cache.set_many({
+            self._token_key(key): {'user_id': user.pk, 'version': version, 'token': token},
+            self._user_key(user.pk, version): user,
+        }, self.ttl)
+
+    def get_user(self, user_id):
+        """Return the cached user or None."""
+        version = self.cache.get(self._version_key(user_id))
+        user = None
+        if version is not None:
+            user = self.cache.get(self._user_key(user_id, version))
+        self._count(user is not None)
+        return user
+
+    def set_user(self, user):
+        """Cache a user under its current version."""
+        version = self._current_version(user.pk)
+        self.cache.set(self._user_key(user.pk, version), user, self.ttl)
+
+    def invalidate_token(self, key):
+        """Drop the entry for a single token key."""
+        self.cache.delete(self._token_key(key))
+
+    def invalidate_user(self, user_id):
+        """Stamp a new version on the user, orphaning every cached entry."""
+        self.cache.set(self._version_key(user_id), uuid.uuid4().hex, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self.cache.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': settings.CACHES[self.alias]['BACKEND'],
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _current_version(self, user_id):
+        version_key = self._version_key(user_id)
+        version = self.cache.get(version_key)
+        if version is None:
+            # Another worker may stamp the version concurrently; keep theirs.
+            self.cache.add(version_key, uuid.uuid4().hex, None)
+            version = self.cache.get(version_key)
+        return version
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def _token_key(key):
+        return f'auth:token:{key}'
+
+    @staticmethod
+    def _version_key(user_id):
+        return f'auth:user:{user_id}:version'
+
+    @staticmethod
+    def _user_key(user_id, version):
+        return f'auth:user:{user_id}:{version}'
+
+
+auth_cache = AuthCache(
+    alias=settings.AUTH_CACHE_ALIAS,
+    ttl=settings.AUTH_CACHE_TTL,
+)
+metrics.register('auth_cache', auth_cache.stats)
@@ -5,20 +5,37 @@ import pytz
 from datetime import datetime, timedelta
 
 from django.conf import settings
+from django.db import connection
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework import authentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.authtoken.models import Token
 
+from user.auth.cache import auth_cache
+from user.auth.signed import is_signed_token, authenticate_signed_token
+
 
 class CheckTokenAuthentication(authentication.TokenAuthentication):
     def authenticate_credentials(self, key):
-        try:
-            token = Token.objects.get(key=key)
-        except Token.DoesNotExist:
-            raise AuthenticationFailed(_('Invalid token.'))
+        # Signed tokens are accepted regardless of AUTH_SIGNED_TOKENS, so
+        # switching the mode off does not log anybody out.
+        if is_signed_token(key):
+            return authenticate_signed_token(key)
+
+        cached = auth_cache.get(key)
+        if cached is not None:
+            user, token = cached
+        else:
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            except Token.DoesNotExist:
+                raise AuthenticationFailed(_('Invalid token.'))
+            user = token.user
+            if user.is_active:
+                auth_cache.set(key, user, token)
 
-        if not token.user.is_active:
+        if not user.is_active:
             raise AuthenticationFailed(_('Inactive or deleted user.'))
 
         utc_now = datetime.utcnow()
@@ -27,5 +44,28 @@ class CheckTokenAuthentication(authentication.TokenAuthentication):
         if token.created < utc_now - timedelta(
             days=settings.AUTH_TOKEN_EXPIRATION_TIME
         ):
+            auth_cache.invalidate_token(key)
             raise AuthenticationFailed(_('The token has expired.'))
-        return token.user, token
+        return user, token
+
+
+def refresh_token(user):
+    """
+    Create the user's token or reset its creation time in a single statement.
+
+    :param user: The user owning the token.
+    :return: The token key.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Token._meta.db_table} (key, user_id, created)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (user_id) DO UPDATE SET created = EXCLUDED.created
+            RETURNING key
+            """,
+            [Token.generate_key(), user.pk, timezone.now()],
+        )
+        key = cursor.fetchone()[0]
+    auth_cache.invalidate_token(key)
+    return key
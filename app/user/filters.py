@@ -2,12 +2,13 @@ from django.contrib.auth import (
     get_user_model,
 )
 from django_filters import rest_framework as filters
+from utils.lookups import TrigramIContains
 
 
 class UserFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
-    email = filters.CharFilter(field_name='email', lookup_expr='icontains')
-    cpf = filters.CharFilter(field_name='cpf', lookup_expr='icontains')
+    name = filters.CharFilter(field_name='name', lookup_expr=TrigramIContains.lookup_name)
+    email = filters.CharFilter(field_name='email', lookup_expr=TrigramIContains.lookup_name)
+    cpf = filters.CharFilter(field_name='cpf', lookup_expr=TrigramIContains.lookup_name)
     roles = filters.CharFilter(field_name='roles__name', lookup_expr='icontains')
 
     class Meta:
@@ -0,0 +1,98 @@
+"""
+Django command to benchmark the login endpoint against seeded users.
+"""
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from user.models import Role
+from user.views import LoginView
+
+PASSWORD = 'benchmark-password'
+
+
+class Rollback(Exception):
+    """Raised to discard the seeded rows."""
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the login endpoint."""
+
+    help = 'Measure LoginView latency against a seeded user base. Seeded rows are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Users to seed.')
+        parser.add_argument('--requests', type=int, default=200, help='Logins to measure.')
+        parser.add_argument(
+            '--fast-hash', action='store_true',
+            help='Use the MD5 hasher so the timings isolate the database path.',
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hash'] else None
+        with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+            try:
+                with transaction.atomic():
+                    emails = self.seed(options['users'])
+                    timings, queries = self.run(emails, options['requests'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+        timings.sort()
+        self.stdout.write(f'users: {options["users"]}, logins: {len(timings)}')
+        self.stdout.write(f'queries per login: {max(queries)}')
+        self.stdout.write(
+            'latency ms: mean {:.2f}, p50 {:.2f}, p95 {:.2f}, max {:.2f}'.format(
+                statistics.mean(timings),
+                timings[len(timings) // 2],
+                timings[int(len(timings) * 0.95)],
+                timings[-1],
+            )
+        )
+
+    def seed(self, count):
+        password = make_password(PASSWORD)
+        users = [
+            get_user_model()(
+                email=f'benchmark-{uuid.uuid4().hex}@example.com',
+                cpf=uuid.uuid4().hex[:14],
+                name='Benchmark',
+                password=password,
+            )
+            for _ in range(count)
+        ]
+        get_user_model().objects.bulk_create(users, batch_size=1000)
+        roles = list(Role.objects.all())
+        if roles:
+            through = get_user_model().roles.through
+            through.objects.bulk_create(
+                [through(user_id=user.id, role_id=roles[index % len(roles)].id) for index, user in enumerate(users)],
+                batch_size=1000,
+            )
+        return [user.email for user in users]
+
+    def run(self, emails, count):
+        factory = RequestFactory()
+        view = LoginView.as_view()
+        step = max(len(emails) // count, 1)
+        timings = []
+        queries = []
+        for email in emails[::step][:count]:
+            request = factory.post('/api/user/login/', {'email': email, 'password': PASSWORD})
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = view(request)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f'Login failed with status {response.status_code}.')
+            queries.append(len(context.captured_queries))
+        return timings, queries
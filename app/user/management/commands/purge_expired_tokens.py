@@ -0,0 +1,19 @@
+"""
+Django command to delete expired auth tokens.
+"""
+from user.auth.sweeper import purge_expired_tokens
+from utils.commands import PeriodicCommand
+
+
+class Command(PeriodicCommand):
+    """Django command to delete expired auth tokens."""
+
+    help = 'Delete expired auth tokens in bounded batches.'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows deleted per batch.')
+
+    def run_once(self, **options):
+        deleted, elapsed = purge_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Removed {deleted} expired tokens in {elapsed:.3f}s.'))
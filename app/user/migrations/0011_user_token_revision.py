@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0010_remove_user_city_remove_user_postal_code_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.10 on 2026-10-18 08:43
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0011_user_token_revision'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='recover_password_attempts',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='recover_password_code_attempts',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.10 on 2026-10-18 08:59
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('user', '0013_trigram_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['name', 'id'], name='users_active_name'),
+        ),
+    ]
@@ -2,20 +2,33 @@
 Database models.
 """
 import uuid
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import Q, Value
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from utils import validate_cpf
+from utils.base_model import ACTIVE_ROWS
 from user.choices import RULE_CHOICES, SUPER_ADMIN
 
 
 class UserManager(BaseUserManager):
     """Manager for users."""
 
+    def get_by_natural_key(self, username):
+        """Fetch the user together with its role names in one query."""
+        user = self.annotate(
+            role_name_list=ArrayAgg('roles__name', filter=Q(roles__isnull=False), default=Value([]))
+        ).get(**{self.model.USERNAME_FIELD: username})
+        user.role_names = frozenset(user.role_name_list)
+        return user
+
     def create_user(self, email, password=None, **extra_fields):
         """Create, save and return a new user."""
         if not email:
@@ -66,9 +79,8 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     recover_password_code = models.CharField(max_length=6, blank=True, null=True)
     recover_password_code_check = models.BooleanField(default=False)
-    recover_password_code_attempts = models.IntegerField(default=0)
-    recover_password_attempts = models.IntegerField(default=0)
     profile_photo = models.FileField(upload_to='uploads/profile_photos/', null=True)
+    token_revision = models.PositiveIntegerField(default=0)
 
     roles = models.ManyToManyField(Role)
 
@@ -78,3 +90,14 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            GinIndex(fields=['name'], name='users_name_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['email'], name='users_email_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['cpf'], name='users_cpf_trgm', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['name', 'id'], name='users_active_name', condition=ACTIVE_ROWS),
+        ]
+
+    @cached_property
+    def role_names(self):
+        """Names of the roles granted to the user, loaded once per instance."""
+        return frozenset(self.roles.values_list('name', flat=True))
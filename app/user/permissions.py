@@ -2,15 +2,20 @@ from rest_framework import permissions
 from user.choices import SELLER, ADMIN, SUPER_ADMIN
 
 
+def has_role(user, role_name):
+    """Check the memoized role names of the user, so checks cost no queries."""
+    return role_name in getattr(user, 'role_names', ())
+
+
 def create_permission_class(permission_type):
     class Permission(permissions.BasePermission):
         def has_permission(self, request, view):
-            return request.user.roles.filter(name=permission_type).exists()
+            return has_role(request.user, permission_type)
 
         def has_object_permission(self, request, view, obj):
             if request.method in permissions.SAFE_METHODS:
                 return True
-            return request.user.roles.filter(name=permission_type).exists()
+            return has_role(request.user, permission_type)
     return Permission
 
 
@@ -2,6 +2,7 @@
 Serializers for the user API View.
 """
 from datetime import datetime
+from django.conf import settings
 from django.contrib.auth import (
     get_user_model,
     authenticate,
@@ -12,6 +13,9 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from utils.file_converters import convert_base64_to_file
 from user.models import Role
+from rest_framework.exceptions import AuthenticationFailed
+from user.auth import auth_cache, issue_signed_token, revoke_signed_tokens
+from user.auth.signed import is_signed_token, authenticate_signed_token
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -70,9 +74,15 @@ class UserSerializer(serializers.ModelSerializer):
         if role_names is not None:
             roles = Role.objects.filter(name__in=role_names)
             user.roles.set(roles)
+
+        if password:
+            # Signed tokens embed the previous credentials; role changes are
+            # revoked by the m2m_changed receiver in user.signals.
+            revoke_signed_tokens(user)
         if profile_photo_base64:
             profile_photo_file = convert_base64_to_file(profile_photo_base64)
             user.profile_photo.save(name=profile_photo_file.name, content=profile_photo_file, save=True)
+        auth_cache.invalidate_user(user.pk)
         return user
 
 
@@ -101,7 +111,7 @@ class AuthTokenSerializer(serializers.Serializer):
 
 
 class TokenRefreshSerializer(serializers.Serializer):
-    token = serializers.CharField(max_length=40)
+    token = serializers.CharField(max_length=255)
 
     def update(self, instance):
         new_token_instance = Token(
@@ -109,6 +119,7 @@ class TokenRefreshSerializer(serializers.Serializer):
             key=Token.generate_key(),
             user=instance.user
         )
+        auth_cache.invalidate_token(instance.key)
         instance.delete()
         new_token_instance.save()
         new_token_instance.token = new_token_instance.key
@@ -117,11 +128,26 @@ class TokenRefreshSerializer(serializers.Serializer):
     def create(self, validated_data):
         # This method will be used to fetch and update the token
         token_key = validated_data.get('token')
+        if is_signed_token(token_key):
+            return self.refresh_signed_token(token_key)
         try:
             token = Token.objects.get(key=token_key)
-            return self.update(token)
         except Token.DoesNotExist:
             raise serializers.ValidationError(_('Invalid token.'))
+        if settings.AUTH_SIGNED_TOKENS:
+            # Trade the authtoken row for a signed token.
+            auth_cache.invalidate_token(token.key)
+            token.delete()
+            return {'token': issue_signed_token(token.user)}
+        return self.update(token)
+
+    def refresh_signed_token(self, token_key):
+        try:
+            user, _payload = authenticate_signed_token(token_key)
+        except AuthenticationFailed as exc:
+            raise serializers.ValidationError(exc.detail)
+        revoke_signed_tokens(user)
+        return {'token': issue_signed_token(user)}
 
 
 class ProfileUserSerializer(serializers.ModelSerializer):
@@ -148,6 +174,7 @@ class ProfileUserSerializer(serializers.ModelSerializer):
         if profile_photo_base64:
             profile_photo_file = convert_base64_to_file(profile_photo_base64)
             instance.profile_photo.save(name=profile_photo_file.name, content=profile_photo_file, save=True)
+        auth_cache.invalidate_user(instance.pk)
         return instance
 
 
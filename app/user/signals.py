@@ -0,0 +1,40 @@
+"""
+Signal handlers for the user app.
+"""
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from user.auth import auth_cache, revoke_signed_tokens
+from user.models import User
+
+
+@receiver(post_save, sender=User)
+def invalidate_inactive_user_tokens(sender, instance, **kwargs):
+    """Drop cached tokens of users that were deactivated or soft deleted."""
+    if not instance.is_active or instance.is_deleted:
+        auth_cache.invalidate_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def revoke_tokens_on_role_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Revoke the cached roles and signed tokens of users whose roles changed,
+    whether through user.roles or role.user_set, so permissions follow at once.
+    """
+    if reverse and action == 'pre_clear':
+        # The cleared users are gone from the table by post_clear.
+        instance._cleared_user_ids = set(instance.user_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        instance.__dict__.pop('role_names', None)
+        revoke_signed_tokens(instance)
+        return
+
+    user_ids = instance.__dict__.pop('_cleared_user_ids', set()) if action == 'post_clear' else pk_set
+    User.objects.filter(pk__in=user_ids).update(token_revision=F('token_revision') + 1)
+    for user_id in user_ids:
+        auth_cache.invalidate_user(user_id)
@@ -1,13 +1,22 @@
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.authtoken.models import Token
-from user.auth import CheckTokenAuthentication
+from rest_framework.test import APIClient
+from user.auth import CheckTokenAuthentication, auth_cache, revoke_signed_tokens
+from user.auth.cache import AuthCache
+from user.choices import ADMIN, SUPER_ADMIN
+from user.models import Role
+from user.permissions import has_role
+from user.serializers import UserSerializer
 from rest_framework.exceptions import AuthenticationFailed
 from django.conf import settings
 import datetime
 
 LOGIN_URL = reverse('user:login')
+REFRESH_URL = reverse('user:login_refresh')
+METRICS_URL = reverse('metrics')
+PROFILE_URL = reverse('user:profile')
 
 
 class CheckTokenAuthenticationTests(TestCase):
@@ -18,6 +27,7 @@ class CheckTokenAuthenticationTests(TestCase):
             name='testuser',
         )
         self.token = Token.objects.create(user=self.user)
+        auth_cache.clear()
 
     def test_valid_token(self):
         authentication = CheckTokenAuthentication()
@@ -51,3 +61,202 @@ class CheckTokenAuthenticationTests(TestCase):
         with self.assertRaises(AuthenticationFailed) as context:
             authentication.authenticate_credentials(self.token.key)
         self.assertEqual(str(context.exception), 'O token expirou.')
+
+
+class AuthCacheTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='testuser',
+        )
+        self.token = Token.objects.create(user=self.user)
+        auth_cache.clear()
+
+    def test_cached_token_skips_database(self):
+        authentication = CheckTokenAuthentication()
+        with self.assertNumQueries(2):
+            authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+        self.assertEqual(auth_cache.stats()['hits'], 1)
+        self.assertEqual(auth_cache.stats()['misses'], 1)
+
+    def test_cached_entries_are_not_shared(self):
+        authentication = CheckTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        first, _ = authentication.authenticate_credentials(self.token.key)
+        first.name = 'changed'
+        second, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(second.name, 'testuser')
+
+    def test_invalidation_reaches_other_workers(self):
+        worker = AuthCache(alias=settings.AUTH_CACHE_ALIAS, ttl=settings.AUTH_CACHE_TTL)
+        worker.set(self.token.key, self.user, self.token)
+        self.assertIsNotNone(worker.get(self.token.key))
+        auth_cache.invalidate_user(self.user.pk)
+        self.assertIsNone(worker.get(self.token.key))
+
+    def test_role_names_are_cached_with_user(self):
+        self.user.roles.add(Role.objects.create(name=ADMIN))
+        authentication = CheckTokenAuthentication()
+        with self.assertNumQueries(2):
+            authentication.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, _ = authentication.authenticate_credentials(self.token.key)
+            self.assertTrue(has_role(user, ADMIN))
+            self.assertFalse(has_role(user, SUPER_ADMIN))
+
+    def test_role_change_invalidates_user(self):
+        authentication = CheckTokenAuthentication()
+        user, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.role_names, frozenset())
+        Role.objects.create(name=ADMIN)
+        serializer = UserSerializer(self.user, data={'role_names': [ADMIN]}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        user, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.role_names, {ADMIN})
+
+    def test_role_change_outside_serializer_invalidates_user(self):
+        role = Role.objects.create(name=ADMIN)
+        authentication = CheckTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        get_user_model().objects.get(pk=self.user.pk).roles.add(role)
+        user, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.role_names, {ADMIN})
+
+        role.user_set.clear()
+        user, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.role_names, frozenset())
+
+    def test_profile_update_invalidates_user(self):
+        authentication = CheckTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        res = client.patch(PROFILE_URL, {'name': 'new name'})
+        self.assertEqual(res.status_code, 200)
+        user, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user.name, 'new name')
+
+    def test_refresh_invalidates_token(self):
+        authentication = CheckTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        res = self.client.post(REFRESH_URL, {'token': self.token.key})
+        self.assertEqual(res.status_code, 201)
+        with self.assertRaises(AuthenticationFailed):
+            authentication.authenticate_credentials(self.token.key)
+
+    def test_login_invalidates_token(self):
+        authentication = CheckTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        self.client.post(LOGIN_URL, {'email': 'test@example.com', 'password': 'testpass123'})
+        self.assertIsNone(auth_cache.get(self.token.key))
+
+    def test_deactivated_user_is_invalidated(self):
+        authentication = CheckTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            authentication.authenticate_credentials(self.token.key)
+
+    def test_soft_deleted_user_is_invalidated(self):
+        authentication = CheckTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+        self.user.is_deleted = True
+        self.user.save()
+        self.assertIsNone(auth_cache.get(self.token.key))
+
+    def test_metrics_expose_counters(self):
+        self.user.roles.add(Role.objects.create(name=ADMIN))
+        CheckTokenAuthentication().authenticate_credentials(self.token.key)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        res = client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['auth_cache']['misses'], 1)
+
+
+@override_settings(AUTH_SIGNED_TOKENS=True)
+class SignedTokenTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='testuser',
+        )
+        self.user.roles.add(Role.objects.create(name=ADMIN))
+        auth_cache.clear()
+
+    def login(self):
+        res = self.client.post(LOGIN_URL, {'email': 'test@example.com', 'password': 'testpass123'})
+        self.assertEqual(res.status_code, 200)
+        return res.data['token']
+
+    def test_login_issues_signed_token(self):
+        key = self.login()
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+        user, payload = CheckTokenAuthentication().authenticate_credentials(key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(payload['roles'], [ADMIN])
+
+    def test_signed_token_skips_token_table(self):
+        key = self.login()
+        authentication = CheckTokenAuthentication()
+        with self.assertNumQueries(1):
+            authentication.authenticate_credentials(key)
+        with self.assertNumQueries(0):
+            user, _ = authentication.authenticate_credentials(key)
+        self.assertTrue(has_role(user, ADMIN))
+
+    def test_role_change_revokes_signed_tokens(self):
+        key = self.login()
+        self.user.roles.remove(*self.user.roles.all())
+        with self.assertRaises(AuthenticationFailed):
+            CheckTokenAuthentication().authenticate_credentials(key)
+
+    def test_tampered_token_is_rejected(self):
+        key = self.login()
+        with self.assertRaises(AuthenticationFailed):
+            CheckTokenAuthentication().authenticate_credentials(key[:-1] + ('A' if key[-1] != 'A' else 'B'))
+
+    def test_expired_signed_token(self):
+        key = self.login()
+        with override_settings(AUTH_TOKEN_EXPIRATION_TIME=-1):
+            with self.assertRaises(AuthenticationFailed) as context:
+                CheckTokenAuthentication().authenticate_credentials(key)
+        self.assertEqual(str(context.exception), 'O token expirou.')
+
+    def test_revoked_signed_token(self):
+        key = self.login()
+        revoke_signed_tokens(self.user)
+        with self.assertRaises(AuthenticationFailed):
+            CheckTokenAuthentication().authenticate_credentials(key)
+
+    def test_database_tokens_keep_working(self):
+        token = Token.objects.create(user=self.user)
+        user, _ = CheckTokenAuthentication().authenticate_credentials(token.key)
+        self.assertEqual(user, self.user)
+
+    def test_refresh_signed_token(self):
+        key = self.login()
+        res = self.client.post(REFRESH_URL, {'token': key})
+        self.assertEqual(res.status_code, 201)
+        self.assertNotEqual(res.data['token'], key)
+        CheckTokenAuthentication().authenticate_credentials(res.data['token'])
+        with self.assertRaises(AuthenticationFailed):
+            CheckTokenAuthentication().authenticate_credentials(key)
+
+    def test_refresh_migrates_database_token(self):
+        token = Token.objects.create(user=self.user)
+        res = self.client.post(REFRESH_URL, {'token': token.key})
+        self.assertEqual(res.status_code, 201)
+        self.assertFalse(Token.objects.filter(key=token.key).exists())
+        user, _ = CheckTokenAuthentication().authenticate_credentials(res.data['token'])
+        self.assertEqual(user, self.user)
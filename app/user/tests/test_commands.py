@@ -0,0 +1,74 @@
+"""
+Test user management commands.
+"""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+
+class PurgeExpiredTokensTests(TestCase):
+    """Test the purge_expired_tokens command."""
+
+    def setUp(self):
+        expired = timezone.now() - timedelta(days=2)
+        for index in range(5):
+            user = get_user_model().objects.create(email=f'user{index}@example.com', cpf=str(index))
+            token = Token.objects.create(user=user)
+            if index < 3:
+                Token.objects.filter(key=token.key).update(created=expired)
+
+    def test_purge_expired_tokens(self):
+        """Test only expired tokens are removed, batch by batch."""
+        out = StringIO()
+
+        call_command('purge_expired_tokens', batch_size=2, stdout=out)
+
+        self.assertEqual(Token.objects.count(), 2)
+        self.assertIn('Removed 3 expired tokens', out.getvalue())
+
+
+class BenchmarkLoginTests(TestCase):
+    """Test the benchmark_login command."""
+
+    def test_benchmark_login(self):
+        """Test the benchmark reports latency and leaves no seeded rows."""
+        out = StringIO()
+
+        call_command('benchmark_login', users=10, requests=5, fast_hash=True, stdout=out)
+
+        self.assertIn('queries per login: 2', out.getvalue())
+        self.assertIn('latency ms', out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class PeriodicCommandTests(TestCase):
+    """Test commands attached as daemons with --interval."""
+
+    def test_interval_repeats_the_job(self):
+        """Test the job runs after every interval until the process stops."""
+        out = StringIO()
+        with patch('utils.commands.time.sleep', side_effect=[None, None, KeyboardInterrupt]) as sleep, \
+                patch('utils.commands.close_old_connections') as close:
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('purge_expired_tokens', interval=60, stdout=out)
+
+        sleep.assert_called_with(60)
+        self.assertEqual(close.call_count, 2)
+        self.assertEqual(out.getvalue().count('Removed 0 expired tokens'), 2)
+
+    def test_failures_do_not_stop_the_loop(self):
+        """Test a failing run is logged and the next one still happens."""
+        with patch('utils.commands.time.sleep', side_effect=[None, None, KeyboardInterrupt]), \
+                patch('utils.commands.close_old_connections'), \
+                patch('user.management.commands.purge_expired_tokens.purge_expired_tokens',
+                      side_effect=OSError('down')) as purge:
+            with self.assertLogs('utils.commands', level='ERROR'), self.assertRaises(KeyboardInterrupt):
+                call_command('purge_expired_tokens', interval=60, stdout=StringIO())
+
+        self.assertEqual(purge.call_count, 2)
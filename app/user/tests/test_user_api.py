@@ -3,12 +3,15 @@ Tests for the user API.
 """
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.authtoken.models import Token
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 from user.models import Role
+from user.throttles import code_attempts_key
+from core.models import OutgoingEmail
 
 CREATE_USER_URL = reverse('user:list_create')
 LOGIN_URL = reverse('user:login')
@@ -114,6 +117,21 @@ class BaseUserApiTests(TestCase):
         self.assertEqual(len(res.data['roles']), 0)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_login_uses_two_queries(self):
+        """Test login fetches user and roles together and upserts the token."""
+        user = create_user(email='test@example.com', password='testpass123', cpf='385.699.040-29')
+        user.roles.add(Role.objects.get(name='ADMIN'))
+        payload = {'email': 'test@example.com', 'password': 'testpass123'}
+
+        with self.assertNumQueries(2):
+            res = self.client.post(LOGIN_URL, payload)
+        with self.assertNumQueries(2):
+            again = self.client.post(LOGIN_URL, payload)
+
+        self.assertEqual(res.data['roles'], ['ADMIN'])
+        self.assertEqual(res.data['token'], again.data['token'])
+        self.assertEqual(Token.objects.filter(user=user).count(), 1)
+
     def test_create_token_bad_credentials(self):
         """Test returns error if credentials invalid."""
         self.client.force_authenticate(user=self.super_admin_user)
@@ -217,6 +235,7 @@ class RecoverPasswordCodeUserViewTests(TestCase):
     """Test cases for RecoverPasswordCodeUserView."""
 
     def setUp(self):
+        cache.clear()
         self.user = get_user_model().objects.create_user(
             email='test@example.com',
             password='testpass123'
@@ -229,12 +248,31 @@ class RecoverPasswordCodeUserViewTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.user.refresh_from_db()
         self.assertIsNotNone(self.user.recover_password_code)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipients, [self.user.email])
+        self.assertIn(self.user.recover_password_code, email.body)
 
     def test_recover_password_user_not_found(self):
         """Test generating a recover password code for a non-existent user."""
         res = self.client.post(RECOVER_PASSWORD_CODE_URL, {'email': 'nonexistent@example.com'})
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_recover_password_throttled_per_ip(self):
+        """Test requests from one client are limited across emails."""
+        for index in range(20):
+            self.client.post(RECOVER_PASSWORD_CODE_URL, {'email': f'user{index}@example.com'})
+        res = self.client.post(RECOVER_PASSWORD_CODE_URL, {'email': self.user.email})
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_recover_password_ip_throttle_ignores_forwarded_for(self):
+        """Test a spoofed X-Forwarded-For header does not reset the per-IP limit."""
+        for index in range(20):
+            self.client.post(RECOVER_PASSWORD_CODE_URL, {'email': f'user{index}@example.com'},
+                             HTTP_X_FORWARDED_FOR=f'10.0.0.{index}')
+        res = self.client.post(RECOVER_PASSWORD_CODE_URL, {'email': self.user.email},
+                               HTTP_X_FORWARDED_FOR='10.0.1.1')
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
 
 class ValidatePasswordCodeViewTests(TestCase):
     """Test cases for ValidatePasswordCodeView."""
@@ -244,9 +282,9 @@ class ValidatePasswordCodeViewTests(TestCase):
             email='test@example.com',
             password='testpass123',
             recover_password_code='1234',
-            recover_password_code_attempts=0
         )
         self.client = APIClient()
+        cache.clear()
 
     def test_password_code_validation_user_not_found(self):
         """Test validation for a non-existent user."""
@@ -256,11 +294,34 @@ class ValidatePasswordCodeViewTests(TestCase):
 
     def test_password_code_validation_attempts_exceeded(self):
         """Test validation when maximum attempts are exceeded."""
-        self.user.recover_password_code_attempts = 3
-        self.user.save()
+        for _ in range(3):
+            self.client.post(VALIDATE_PASSWORD_CODE_URL,
+                             {'email': self.user.email, 'recover_password_code': 'wrongcode'})
+        with self.assertNumQueries(0):
+            res = self.client.post(VALIDATE_PASSWORD_CODE_URL,
+                                   {'email': self.user.email, 'recover_password_code': '1234'})
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_password_code_validation_burns_code_after_failed_attempts(self):
+        """Test the code is cleared once the maximum number of wrong guesses is reached."""
+        for _ in range(2):
+            self.client.post(VALIDATE_PASSWORD_CODE_URL,
+                             {'email': self.user.email, 'recover_password_code': 'wrongcode'})
         res = self.client.post(VALIDATE_PASSWORD_CODE_URL,
                                {'email': self.user.email, 'recover_password_code': 'wrongcode'})
         self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.recover_password_code)
+
+    def test_password_code_validation_correct_code_resets_attempts(self):
+        """Test a correct code clears the count of earlier wrong guesses."""
+        for _ in range(2):
+            self.client.post(VALIDATE_PASSWORD_CODE_URL,
+                             {'email': self.user.email, 'recover_password_code': 'wrongcode'})
+        res = self.client.post(VALIDATE_PASSWORD_CODE_URL,
+                               {'email': self.user.email, 'recover_password_code': '1234'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(cache.get(code_attempts_key(self.user)))
 
     def test_password_code_validation_incorrect_code(self):
         """Test validation with an incorrect code."""
@@ -275,7 +336,6 @@ class ValidatePasswordCodeViewTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.user.refresh_from_db()
         self.assertNotEqual(self.user.recover_password_code, '1234')
-        self.assertEqual(self.user.recover_password_code_attempts, 0)
 
 
 class ChangePasswordCodeViewTests(TestCase):
@@ -286,9 +346,9 @@ class ChangePasswordCodeViewTests(TestCase):
             email='test@example.com',
             password='testpass123',
             recover_password_code='1234',
-            recover_password_attempts=0
         )
         self.client = APIClient()
+        cache.clear()
 
     def test_password_change_user_not_found(self):
         """Test password change for a non-existent user."""
@@ -318,13 +378,23 @@ class ChangePasswordCodeViewTests(TestCase):
 
     def test_password_change_attempts_exceeded(self):
         """Test password change when maximum attempts are exceeded."""
-        self.user.recover_password_attempts = 4
-        self.user.save()
-        res = self.client.post(
-            CHANGE_PASSWORD_CODE_URL,
-            {'email': self.user.email, 'recover_password_code': 'wrongcode', 'password': 'newpassword'}
-        )
+        payload = {'email': self.user.email, 'recover_password_code': 'wrongcode', 'password': 'newpassword'}
+        for _ in range(3):
+            self.client.post(CHANGE_PASSWORD_CODE_URL, payload)
+        with self.assertNumQueries(0):
+            res = self.client.post(CHANGE_PASSWORD_CODE_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_password_change_burns_code_after_failed_attempts(self):
+        """Test the code is cleared once the maximum number of wrong guesses is reached."""
+        payload = {'email': self.user.email, 'recover_password_code': 'wrongcode', 'password': 'newpassword'}
+        for _ in range(2):
+            self.client.post(CHANGE_PASSWORD_CODE_URL, payload)
+        res = self.client.post(CHANGE_PASSWORD_CODE_URL, payload)
         self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.recover_password_code)
+        self.assertTrue(self.user.check_password('testpass123'))
 
     def test_password_change_incorrect_code(self):
         """Test password change with an incorrect code."""
@@ -344,7 +414,6 @@ class ChangePasswordCodeViewTests(TestCase):
         self.user.refresh_from_db()
         self.assertTrue(self.user.check_password('newpassword'))
         self.assertIsNone(self.user.recover_password_code)
-        self.assertEqual(self.user.recover_password_attempts, 0)
 
 
 class ListUsersApiTests(TestCase):
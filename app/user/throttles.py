@@ -0,0 +1,81 @@
+"""
+Throttles for the password recovery endpoints.
+
+Request history is kept in the cache, so rejected requests are answered
+before the view touches the database. Wrong guesses against a recovery code
+are counted in the cache as well, and the code is burned after
+PASSWORD_CODE_MAX_ATTEMPTS of them.
+"""
+import abc
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import ScopedRateThrottle
+
+
+class PasswordRecoveryThrottle(ScopedRateThrottle, metaclass=abc.ABCMeta):
+    """Sliding-window limit for ``<throttle_scope>_<kind>`` rates."""
+    kind = None
+
+    def allow_request(self, request, view):
+        scope = getattr(view, self.scope_attr, None)
+        if not scope:
+            return True
+
+        self.scope = f'{scope}_{self.kind}'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super(ScopedRateThrottle, self).allow_request(request, view)
+
+    @abc.abstractmethod
+    def get_identifier(self, request):
+        """Return what the requests are counted by, or None to let the request through."""
+
+    def get_cache_key(self, request, view):
+        ident = self.get_identifier(request)
+        if not ident:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class PasswordRecoveryEmailThrottle(PasswordRecoveryThrottle):
+    """Limit requests per target email."""
+    kind = 'email'
+
+    def get_identifier(self, request):
+        email = str(request.data.get('email') or '').strip().lower()
+        if not email:
+            return None
+        # Hash the address so arbitrary input makes a safe cache key.
+        return hashlib.sha256(email.encode()).hexdigest()
+
+
+class PasswordRecoveryIPThrottle(PasswordRecoveryThrottle):
+    """Limit requests per client IP."""
+    kind = 'ip'
+
+    def get_identifier(self, request):
+        return self.get_ident(request)
+
+
+def code_attempts_key(user):
+    return f'password_code_attempts:{user.pk}'
+
+
+def record_failed_code_attempt(user):
+    """Count a wrong recovery code for the user; return True once the code must be burned."""
+    key = code_attempts_key(user)
+    cache.add(key, 0, None)
+    try:
+        attempts = cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, None)
+        attempts = 1
+    return attempts >= settings.PASSWORD_CODE_MAX_ATTEMPTS
+
+
+def reset_code_attempts(user):
+    """Forget the wrong guesses made against the user's previous code."""
+    cache.delete(code_attempts_key(user))
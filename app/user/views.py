@@ -2,8 +2,7 @@
 Views for the user API.
 """
 
-import threading
-from django.utils import timezone
+from django.conf import settings
 from random import randint
 from django.contrib.auth import (
     get_user_model,
@@ -15,7 +14,6 @@ from rest_framework.settings import api_settings
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.authtoken.models import Token
 from django_filters.rest_framework import DjangoFilterBackend
 
 from user.serializers import (
@@ -29,10 +27,19 @@ from user.serializers import (
 )
 from user.auth import (
     CheckTokenAuthentication,
+    issue_signed_token,
+    refresh_token,
+    revoke_signed_tokens,
 )
 from user.permissions import IsSuperAdmin, IsAdmin
 from user.filters import UserFilter
-from utils.email import send_password_reset_code
+from user.throttles import (
+    PasswordRecoveryEmailThrottle,
+    PasswordRecoveryIPThrottle,
+    record_failed_code_attempt,
+    reset_code_attempts,
+)
+from utils.email import queue_password_reset_code
 from utils.pagination import CustomPagination
 
 
@@ -73,6 +80,7 @@ class UserRetrieveUpdateView(generics.RetrieveUpdateDestroyAPIView):
     def perform_destroy(self, instance):
         instance.is_deleted = True
         instance.save()
+        revoke_signed_tokens(instance)
 
 
 class LoginView(ObtainAuthToken):
@@ -84,16 +92,16 @@ class LoginView(ObtainAuthToken):
         serializer = self.serializer_class(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
-        token, _ = Token.objects.get_or_create(user=user)
-        roles = user.roles.all().values_list('name', flat=True)
-        token.created = timezone.now()
-        token.save()
+        if settings.AUTH_SIGNED_TOKENS:
+            token_key = issue_signed_token(user)
+        else:
+            token_key = refresh_token(user)
         return Response({
-            'token': token.key,
+            'token': token_key,
             'email': user.email,
             'name': user.name,
             'profile_photo': user.profile_photo.url if user.profile_photo else None,
-            'roles': list(roles)
+            'roles': list(user.role_names)
         })
 
 
@@ -112,9 +120,21 @@ class ProfileUserView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
+def burn_code_after_failed_attempt(user):
+    """Record a wrong code; clear the user's code once too many guesses were made."""
+    if not record_failed_code_attempt(user):
+        return False
+    user.recover_password_code = None
+    user.save()
+    reset_code_attempts(user)
+    return True
+
+
 class RecoverPasswordCodeUserView(generics.CreateAPIView):
     """Create a new user in the system."""
     serializer_class = RecoverPasswordUserSerializer
+    throttle_classes = [PasswordRecoveryEmailThrottle, PasswordRecoveryIPThrottle]
+    throttle_scope = 'password_recover_code'
 
     def create(self, request, *args, **kwargs):
         try:
@@ -124,13 +144,15 @@ class RecoverPasswordCodeUserView(generics.CreateAPIView):
         code = str(randint(1111, 9999))
         user.recover_password_code = code
         user.save()
-        thread = threading.Thread(target=send_password_reset_code, kwargs={'user': user})
-        thread.start()
+        reset_code_attempts(user)
+        queue_password_reset_code(user)
         return Response(status=status.HTTP_200_OK)
 
 
 class ValidatePasswordCodeView(generics.CreateAPIView):
     serializer_class = ValidatePasswordCodeUserSerializer
+    throttle_classes = [PasswordRecoveryEmailThrottle, PasswordRecoveryIPThrottle]
+    throttle_scope = 'password_validate_code'
 
     def create(self, request, *args, **kwargs):
         email = request.data.get("email")
@@ -141,26 +163,24 @@ class ValidatePasswordCodeView(generics.CreateAPIView):
         except ObjectDoesNotExist:
             return Response({'detail': _("User not found.")}, status=status.HTTP_404_NOT_FOUND)
 
-        user.recover_password_code_attempts = user.recover_password_code_attempts+1
-        user.save()
-
-        if user.recover_password_code_attempts >= 3:
-            user.recover_password_code_attempts = 0
-            user.recover_password_code = None
-            user.save()
-            return Response({'detail': _("Attempts exceeded.")}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        if not user.recover_password_code:
+            return Response({'detail': _("Invalid Code.")}, status=status.HTTP_400_BAD_REQUEST)
 
         if user.recover_password_code != input_code:
+            if burn_code_after_failed_attempt(user):
+                return Response({'detail': _("Attempts exceeded.")}, status=status.HTTP_429_TOO_MANY_REQUESTS)
             return Response({'detail': _("Invalid Code.")}, status=status.HTTP_400_BAD_REQUEST)
 
         user.recover_password_code = str(randint(1111, 9999))
-        user.recover_password_code_attempts = 0
         user.save()
+        reset_code_attempts(user)
         return Response({"recover_password_code": user.recover_password_code}, status=status.HTTP_200_OK)
 
 
 class ChangePasswordCodeView(generics.CreateAPIView):
     serializer_class = ChangePasswordCodeSerializer
+    throttle_classes = [PasswordRecoveryEmailThrottle, PasswordRecoveryIPThrottle]
+    throttle_scope = 'password_change_code'
 
     def create(self, request, *args, **kwargs):
         email = request.data.get("email")
@@ -175,21 +195,15 @@ class ChangePasswordCodeView(generics.CreateAPIView):
         if not user.recover_password_code:
             return Response({'detail': _("Code does not exist.")}, status=status.HTTP_404_NOT_FOUND)
 
-        user.recover_password_attempts += 1
-        user.save()
-
-        if user.recover_password_attempts > 3:
-            user.recover_password_attempts = 0
-            user.recover_password_code = None
-            user.save()
-            return Response({'detail': _("Attempts exceeded.")}, status=status.HTTP_429_TOO_MANY_REQUESTS)
-
         if recover_password_code == user.recover_password_code:
             user.set_password(password)
             user.recover_password_code_check = False
             user.recover_password_code = None
-            user.recover_password_attempts = 0
             user.save()
+            reset_code_attempts(user)
+            revoke_signed_tokens(user)
             return Response(status=status.HTTP_200_OK)
 
+        if burn_code_after_failed_attempt(user):
+            return Response({'detail': _("Attempts exceeded.")}, status=status.HTTP_429_TOO_MANY_REQUESTS)
         return Response({'detail': _("Invalid code.")}, status=status.HTTP_400_BAD_REQUEST)
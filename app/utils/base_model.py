@@ -1,6 +1,16 @@
 import uuid
 from django.db import models
 
+# Condition of the partial indexes that serve the active-row queries
+ACTIVE_ROWS = models.Q(is_deleted=False)
+
+
+class ActiveManager(models.Manager):
+    """Manager of the rows that are not soft deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
 
 class BaseModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -9,5 +19,8 @@ class BaseModel(models.Model):
     is_active = models.BooleanField(default=True)
     is_deleted = models.BooleanField(default=False)
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
     class Meta:
         abstract = True
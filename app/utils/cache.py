@@ -0,0 +1,29 @@
+"""
+Checks that the configured caches are shared by every process serving requests.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+
+def is_process_local(alias):
+    """Return True when the entries of the cache are only visible to the current process."""
+    return isinstance(caches[alias], LocMemCache)
+
+
+def check_shared_caches(processes):
+    """
+    Refuse to serve from several processes with a process-local cache.
+
+    Versions stamped by one worker would never reach the others, which would
+    keep serving revoked users and outdated responses until their TTL.
+
+    :param processes: The number of worker processes serving requests.
+    """
+    local = [alias for alias in settings.CACHES if is_process_local(alias)]
+    if processes > 1 and local:
+        raise ImproperlyConfigured(
+            f'Caches {", ".join(local)} use LocMemCache, which is not shared by the {processes} workers. '
+            'Set CACHE_BACKEND and CACHE_LOCATION to a shared backend such as redis.'
+        )
@@ -0,0 +1,40 @@
+"""
+Base for maintenance commands that run once or keep running as a daemon.
+"""
+import abc
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicCommand(BaseCommand, metaclass=abc.ABCMeta):
+    """
+    Run the job once, or every --interval seconds when uWSGI attaches the
+    command as a single daemon next to its workers (see scripts/run.sh).
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0, help='Keep running and repeat the job every INTERVAL seconds.'
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if not options['interval']:
+            self.run_once(**options)
+            return
+        while True:
+            time.sleep(options['interval'])
+            close_old_connections()
+            try:
+                self.run_once(**options)
+            except Exception:
+                logger.exception('Periodic command %s failed.', self.__module__)
+
+    @abc.abstractmethod
+    def run_once(self, **options):
+        """Run the job a single time."""
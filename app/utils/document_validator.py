@@ -3,11 +3,18 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 
+def normalize_document(value):
+    """
+    Return only the digits of a CPF or CNPJ.
+    """
+    return re.sub(r"[^0-9]", "", value or "")
+
+
 def validate_cpf_cnpj(value):
     """
     Validate whether the provided value is a valid CPF or CNPJ.
     """
-    cpf_cnpj = re.sub(r"[^0-9]", "", value)  # Remove non-numeric characters
+    cpf_cnpj = normalize_document(value)
 
     if len(cpf_cnpj) == 11:
         if not validate_cpf(cpf_cnpj):
@@ -1,18 +1,40 @@
 from django.core.mail import EmailMessage
-from django.template.loader import get_template
 from django.utils.translation import gettext_lazy as _
+from core.outbox import enqueue_email
 from user.models import User
+from utils.templates import email_renderer
 
+PASSWORD_RESET_CODE_TEMPLATE = 'Layouts/email/password_reset_code.html'
 
-def send_password_reset_code(user: User):
+
+def build_password_reset_code_message(user: User):
     """
-    Sends an email with a password reset code to a user.
+    Builds the email with a password reset code for a user.
 
     :param user: The user object to whom the email should be sent.
+    :return: The EmailMessage, not yet sent.
     """
     context = {'code': user.recover_password_code}
-    message = get_template('Layouts/email/password_reset_code.html').render(context)
+    message = email_renderer.render(PASSWORD_RESET_CODE_TEMPLATE, context)
     subject = _('Your code to generate a new password!')
     email = EmailMessage(subject, message, to=[user.email])
     email.content_subtype = 'html'
-    email.send()
+    return email
+
+
+def send_password_reset_code(user: User):
+    """
+    Sends an email with a password reset code to a user.
+
+    :param user: The user object to whom the email should be sent.
+    """
+    build_password_reset_code_message(user).send()
+
+
+def queue_password_reset_code(user: User):
+    """
+    Queues the password reset code email in the outbox.
+
+    :param user: The user object to whom the email should be sent.
+    """
+    return enqueue_email(build_password_reset_code_message(user))
@@ -0,0 +1,28 @@
+from django.db import models
+from utils.document_validator import normalize_document
+
+
+class DocumentDigitsField(models.CharField):
+    """
+    Digits of the CPF/CNPJ held in `source`, refreshed whenever the row is
+    written through save(), create() or bulk_create().
+    """
+
+    def __init__(self, *args, source, **kwargs):
+        self.source = source
+        kwargs.setdefault('max_length', 14)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        if kwargs.get('max_length') == 14:
+            del kwargs['max_length']
+        kwargs.pop('editable', None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = normalize_document(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
@@ -0,0 +1,24 @@
+from django.db import models
+from django.db.models.lookups import IContains
+
+
+@models.CharField.register_lookup
+@models.TextField.register_lookup
+class TrigramIContains(IContains):
+    """
+    `icontains` written as `column ILIKE '%value%'` on PostgreSQL.
+
+    Django compiles `icontains` to `UPPER(column::text) LIKE UPPER(...)`, which
+    a pg_trgm GIN index on the column cannot serve; ILIKE can.
+    """
+    lookup_name = 'trgm_icontains'
+
+    def as_sql(self, compiler, connection):
+        return IContains(self.lhs, self.rhs).as_sql(compiler, connection)
+
+    def as_postgresql(self, compiler, connection):
+        if not self.rhs_is_direct_value():
+            return self.as_sql(compiler, connection)
+        lhs_sql, params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs_sql} ILIKE {rhs_sql}', params + rhs_params
@@ -0,0 +1,19 @@
+"""
+Registry of in-process counters exposed by the metrics endpoint.
+"""
+_collectors = {}
+
+
+def register(name, collector):
+    """
+    Register a callable returning a dict of counters under the given name.
+
+    :param name: The key under which the counters are reported.
+    :param collector: A callable without arguments returning a dict.
+    """
+    _collectors[name] = collector
+
+
+def collect():
+    """Return the current value of every registered collector."""
+    return {name: collector() for name, collector in _collectors.items()}
@@ -1,14 +1,301 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import datetime
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from urllib.parse import urlparse, parse_qs
 from rest_framework.response import Response
 
+CURSOR = 'cursor'
+EXACT = 'exact'
+CACHED = 'cached'
+ESTIMATED = 'estimated'
+NONE = 'none'
+
+
+class ExactCountPaginator(Paginator):
+    count_strategy = EXACT
+
+
+class LookaheadPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+
+class LookaheadPaginator(Paginator):
+    """
+    Page without trusting the count: fetch one extra row to tell whether a
+    next page exists, so stale or estimated counts never truncate a page.
+    """
+
+    @cached_property
+    def num_pages(self):
+        # Unknown without an exact count; keeps the browsable API page controls off.
+        return 1
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        items = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not items and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return LookaheadPage(items[:self.per_page], number, self, has_next=len(items) > self.per_page)
+
+
+class CachedCountPaginator(LookaheadPaginator):
+    """Share the exact count of identical querysets for a short TTL."""
+    count_strategy = CACHED
+
+    @cached_property
+    def count(self):
+        query = self.object_list.order_by().query
+        sql, params = query.sql_with_params()
+        digest = hashlib.sha256(f'{sql}{params!r}'.encode()).hexdigest()
+        key = f'pagination:count:{query.model._meta.label_lower}:{digest}'
+        return cache.get_or_set(key, lambda: Paginator.count.func(self), settings.PAGINATION_COUNT_CACHE_TTL)
+
+
+class EstimatedCountPaginator(LookaheadPaginator):
+    """Read the row count from the PostgreSQL planner, exact when small."""
+    count_strategy = ESTIMATED
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        if estimate is None or estimate < settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+            self.count_strategy = EXACT
+            return Paginator.count.func(self)
+        return estimate
+
+    def estimate(self):
+        queryset = self.object_list.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class UncountedPaginator(LookaheadPaginator):
+    """Skip the count entirely."""
+    count_strategy = NONE
+
+    @cached_property
+    def count(self):
+        return None
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder for cursor values that keeps the microseconds of datetimes
+    and times, which DjangoJSONEncoder cuts to milliseconds. Django parses
+    the full ISO strings back exactly when they are compared to the column.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on the queryset ordering plus the id as tiebreaker.
+
+    Pages are read with a `WHERE (ordering, id) > (cursor)` predicate instead
+    of an OFFSET, so the cost of a page does not depend on its depth.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        values, reverse = self.decode_cursor(request)
+
+        ordering = [self.invert(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.get_seek_filter(ordering, values))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = values is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': None,
+            'count_strategy': NONE,
+            'next': self.get_next_cursor(),
+            'previous': self.get_previous_cursor(),
+            'results': data
+        })
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        """Return the ordering as local column names, ending with the id."""
+        ordering = []
+        for field in queryset.query.order_by or getattr(view, 'ordering', None) or []:
+            prefix = '-' if field.startswith('-') else ''
+            name = field.lstrip('-')
+            name = 'id' if name == 'pk' else queryset.model._meta.get_field(name).attname
+            ordering.append(f'{prefix}{name}')
+        if not any(field.lstrip('-') == 'id' for field in ordering):
+            ordering.append('id')
+        return ordering
+
+    def get_seek_filter(self, ordering, values):
+        """
+        Build `(a, b) > (x, y)` as `a >= x AND (a > x OR (a = x AND b > y))`,
+        honouring each direction. The redundant bound on the leading column
+        lets the index scan start at the cursor.
+        """
+        seek = Q()
+        for index, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            conditions = {previous.lstrip('-'): value for previous, value in zip(ordering, values[:index])}
+            conditions[f'{field.lstrip("-")}__{lookup}'] = values[index]
+            seek |= Q(**conditions)
+        first = ordering[0]
+        lookup = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{lookup}': values[0]}) & seek
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_cursor(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        values = [getattr(instance, field.lstrip('-')) for field in self.ordering]
+        payload = json.dumps({'v': values, 'r': reverse}, cls=CursorEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = payload['v'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+        ]
+
 
 class CustomPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    # Views may set `pagination_mode = 'cursor'`; clients may pass ?pagination=cursor.
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+    # Views may set `count_strategy`; clients may pass ?count=exact|cached|estimated|none.
+    count_query_param = 'count'
+    count_paginator_classes = {
+        EXACT: ExactCountPaginator,
+        CACHED: CachedCountPaginator,
+        ESTIMATED: EstimatedCountPaginator,
+        NONE: UncountedPaginator,
+    }
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.get_mode(request, view) == CURSOR:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.django_paginator_class = self.count_paginator_classes[self.get_count_strategy(request, view)]
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count_strategy(self, request, view):
+        for strategy in (
+            request.query_params.get(self.count_query_param),
+            getattr(view, 'count_strategy', None),
+            settings.PAGINATION_COUNT_STRATEGY,
+        ):
+            if strategy in self.count_paginator_classes:
+                return strategy
+        return EXACT
+
+    def get_mode(self, request, view):
+        if request.query_params.get(self.keyset_class.cursor_query_param):
+            return CURSOR
+        return request.query_params.get(self.mode_query_param) or getattr(view, 'pagination_mode', None)
 
     def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+
         next_page = None
         previous_page = None
 
@@ -26,7 +313,26 @@ class CustomPagination(PageNumberPagination):
 
         return Response({
             'count': self.page.paginator.count,
+            'count_strategy': self.page.paginator.count_strategy,
             'next': next_page,
             'previous': previous_page,
             'results': data
         })
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Pagination mode: "page" (default) or "cursor".',
+                'schema': {'type': 'string', 'enum': ['page', CURSOR]},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'How the total count is computed; "none" skips it.',
+                'schema': {'type': 'string', 'enum': list(self.count_paginator_classes)},
+            },
+        ] + self.keyset_class().get_schema_operation_parameters(view)
@@ -0,0 +1,74 @@
+"""
+Rendering service for transactional email templates.
+"""
+import threading
+
+from django.dispatch import receiver
+from django.template import Engine, engines
+from django.template.context import make_context
+from django.utils.autoreload import file_changed
+
+
+class TemplateRenderer:
+    """Render through a private engine whose cached loader compiles each
+    template, and the parents it extends or includes, once per process.
+
+    Works independently of the loaders configured in TEMPLATES, so the
+    templates stay compiled while DEBUG disables the cached loader.
+    """
+
+    def __init__(self):
+        self._engine = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = self._build_engine()
+        return self._engine
+
+    def get(self, name):
+        """Return the compiled template, compiling it on first use."""
+        return self.engine.get_template(name)
+
+    def render(self, name, context=None):
+        return self.get(name).render(make_context(context, autoescape=self.engine.autoescape))
+
+    def render_many(self, name, contexts):
+        """Render a batch of contexts with the same compiled template."""
+        template = self.get(name)
+        return [template.render(make_context(context, autoescape=self.engine.autoescape)) for context in contexts]
+
+    def clear(self):
+        with self._lock:
+            if self._engine is not None:
+                for loader in self._engine.template_loaders:
+                    loader.reset()
+
+    @staticmethod
+    def _build_engine():
+        """Mirror the configured Django engine behind a cached loader."""
+        configured = engines['django'].engine
+        loaders = ['django.template.loaders.filesystem.Loader']
+        if configured.app_dirs:
+            loaders.append('django.template.loaders.app_directories.Loader')
+        return Engine(
+            dirs=configured.dirs,
+            loaders=[('django.template.loaders.cached.Loader', loaders)],
+            debug=configured.debug,
+            libraries=configured.libraries,
+            autoescape=configured.autoescape,
+            string_if_invalid=configured.string_if_invalid,
+            file_charset=configured.file_charset,
+        )
+
+
+email_renderer = TemplateRenderer()
+
+
+@receiver(file_changed, dispatch_uid='email_renderer_file_changed')
+def clear_compiled_templates(sender, file_path, **kwargs):
+    """Recompile after template edits under the development autoreloader."""
+    email_renderer.clear()
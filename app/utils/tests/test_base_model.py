@@ -0,0 +1,31 @@
+from django.test import TestCase
+
+from producer.models import Farm, Producer
+
+
+class ActiveManagerTestCase(TestCase):
+
+    def setUp(self):
+        self.producer = Producer.objects.create(name='Producer 1', cpf_cnpj='123.456.789-01')
+        self.deleted = Producer.objects.create(name='Producer 2', cpf_cnpj='123.456.789-01', is_deleted=True)
+
+    def test_default_manager_hides_deleted_rows(self):
+        self.assertEqual(list(Producer.objects.all()), [self.producer])
+        self.assertEqual(Producer._default_manager.count(), 1)
+
+    def test_all_objects_includes_deleted_rows(self):
+        self.assertEqual(Producer.all_objects.count(), 2)
+
+    def test_relations_still_reach_deleted_rows(self):
+        farm = Farm.objects.create(
+            name='Farm 1',
+            city='City',
+            state='SP',
+            total_area=100,
+            arable_area=70,
+            vegetation_area=30,
+            producer=self.deleted,
+        )
+        farm.refresh_from_db()
+
+        self.assertEqual(farm.producer, self.deleted)
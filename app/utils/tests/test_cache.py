@@ -0,0 +1,20 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from utils.cache import check_shared_caches
+
+SHARED_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class CheckSharedCachesTestCase(SimpleTestCase):
+
+    def test_single_worker_may_use_locmem(self):
+        check_shared_caches(1)
+
+    def test_several_workers_refuse_locmem(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'not shared by the 4 workers'):
+            check_shared_caches(4)
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_several_workers_with_shared_cache(self):
+        check_shared_caches(4)
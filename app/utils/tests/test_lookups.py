@@ -0,0 +1,31 @@
+from django.test import TestCase
+
+from producer.models import Producer
+from utils.lookups import TrigramIContains
+
+
+class TrigramIContainsTestCase(TestCase):
+
+    def setUp(self):
+        Producer.objects.create(name='Fazenda Boa Vista', cpf_cnpj='123.456.789-01')
+        Producer.objects.create(name='100% Orgânico_Ltda', cpf_cnpj='18.200.327/0001-72')
+
+    def filter(self, **lookups):
+        return Producer.objects.filter(
+            **{f'{field}__{TrigramIContains.lookup_name}': value for field, value in lookups.items()}
+        )
+
+    def test_compiles_to_ilike_on_the_bare_column(self):
+        sql = str(self.filter(name='boa').query)
+        self.assertIn('"producers"."name" ILIKE', sql)
+        self.assertNotIn('UPPER', sql)
+
+    def test_matches_like_icontains(self):
+        for term in ('boa vista', 'VISTA', 'orgânico', '456.789', '%', '_', '0%'):
+            self.assertEqual(
+                set(self.filter(name=term).union(self.filter(cpf_cnpj=term))),
+                set(Producer.objects.filter(name__icontains=term).union(
+                    Producer.objects.filter(cpf_cnpj__icontains=term)
+                )),
+                term,
+            )
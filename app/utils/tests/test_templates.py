@@ -0,0 +1,34 @@
+from unittest.mock import patch
+
+from django.template.loaders.filesystem import Loader
+from django.test import SimpleTestCase, override_settings
+
+from utils.templates import TemplateRenderer
+
+TEMPLATE = 'Layouts/email/password_reset_code.html'
+
+
+@override_settings(DEBUG=True)
+class TemplateRendererTestCase(SimpleTestCase):
+
+    def test_compiles_template_and_parent_once(self):
+        renderer = TemplateRenderer()
+        with patch.object(Loader, 'get_contents', autospec=True, side_effect=Loader.get_contents) as get_contents:
+            renderer.render(TEMPLATE, {'code': '1234'})
+            renderer.render(TEMPLATE, {'code': '5678'})
+        names = [call.args[1].template_name for call in get_contents.call_args_list]
+        self.assertEqual(names, [TEMPLATE, 'Layouts/email/default.html'])
+
+    def test_render_many(self):
+        renderer = TemplateRenderer()
+        messages = renderer.render_many(TEMPLATE, [{'code': '1234'}, {'code': '5678'}])
+        self.assertIn('1234', messages[0])
+        self.assertIn('5678', messages[1])
+
+    def test_clear(self):
+        renderer = TemplateRenderer()
+        renderer.render(TEMPLATE, {'code': '1234'})
+        renderer.clear()
+        with patch.object(Loader, 'get_contents', autospec=True, side_effect=Loader.get_contents) as get_contents:
+            renderer.render(TEMPLATE, {'code': '1234'})
+        self.assertEqual(get_contents.call_count, 2)
@@ -6,4 +6,18 @@ python manage.py wait_for_db
 python manage.py migrate
 python manage.py loaddata user/fixtures/roles
 
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
+# Periodic jobs run as single daemons supervised by the uWSGI master, never
+# inside the workers: "<interval variable> <command>", 0 or unset disables
+for job in \
+    "AUTH_TOKEN_PURGE_INTERVAL purge_expired_tokens" \
+    "EMAIL_OUTBOX_DRAIN_INTERVAL drain_outbox" \
+    "ANALYTICS_REFRESH_INTERVAL refresh_analytics"
+do
+    set -- $job
+    interval=$(printenv "$1" || true)
+    if [ "${interval:-0}" -gt 0 ]; then
+        daemons="$daemons --attach-daemon \"python manage.py $2 --interval $interval\""
+    fi
+done
+
+eval uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi $daemons